@@ -0,0 +1,61 @@
+"""Import time of gridparser.
+
+Run with `asv <https://asv.readthedocs.io>`_ or directly via::
+
+    python benchmarks/import_time.py
+
+which fails if ``import gridparser`` exceeds :data:`BUDGET` or if one of
+the :data:`LAZY_MODULES` is imported eagerly.
+"""
+from __future__ import print_function
+import os
+import subprocess
+import sys
+
+#: Maximal cumulative import time of gridparser in seconds.
+BUDGET = 0.3
+
+#: Heavy dependencies that may only be imported on first use.
+LAZY_MODULES = ['pandas', 'scipy', 'chemcoord']
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timeraw_import_gridparser():
+    return "import gridparser"
+
+
+def measure_import_time():
+    """Return the cumulative import time of gridparser and the
+    lazy modules that were imported with it.
+    """
+    check = ("import sys, gridparser; "
+             "print(' '.join(m for m in {0} if m in sys.modules))").format(
+                 LAZY_MODULES)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', check],
+        cwd=_ROOT, capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in process.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'gridparser':
+            cumulative = int(fields[1]) * 1e-6
+    return cumulative, process.stdout.split()
+
+
+def main():
+    import_time, eager = measure_import_time()
+    print('import gridparser: {0:.3f} s (budget {1:.3f} s)'.format(
+        import_time, BUDGET))
+    failed = False
+    if import_time > BUDGET:
+        print('Import time exceeds the budget.')
+        failed = True
+    if eager:
+        print('Eagerly imported: {0}'.format(', '.join(eager)))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Benchmarks of the parser and of the orbital access.
+
+The sizes range from 10^4 to 10^8 points. The synthetic grid files are
+generated on first use and cached, see :mod:`benchmarks.synthetic`.
+"""
+from __future__ import division
+import os
+import time
+
+from gridparser import Grid
+from gridparser._tokenize import numba_available
+
+from .synthetic import cached_grid_file
+
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]
+
+TOKENIZERS = ['numpy', 'numba']
+
+
+class ParseGrid(object):
+    params = [SIZES, TOKENIZERS]
+    param_names = ['n_points', 'tokenizer']
+    timeout = 3600
+    number = 1
+    repeat = 1
+
+    def setup(self, n_points, tokenizer):
+        if tokenizer == 'numba' and not numba_available():
+            raise NotImplementedError('numba is not installed')
+        self.path = cached_grid_file(n_points)
+        if tokenizer == 'numba':
+            # Compile the kernels outside of the measurement.
+            Grid.parse_grid(cached_grid_file(10 ** 4), tokenizer=tokenizer)
+
+    def time_parse_grid(self, n_points, tokenizer):
+        Grid.parse_grid(self.path, tokenizer=tokenizer)
+
+    def time_parse_grid_float32(self, n_points, tokenizer):
+        Grid.parse_grid(self.path, dtype='f4', tokenizer=tokenizer)
+
+    def peakmem_parse_grid(self, n_points, tokenizer):
+        Grid.parse_grid(self.path, tokenizer=tokenizer)
+
+    def track_points_per_second(self, n_points, tokenizer):
+        start = time.time()
+        grid = Grid.parse_grid(self.path, tokenizer=tokenizer)
+        duration = time.time() - start
+        return grid.metadata['N_of_Points'] * grid.metadata['N_of_Grids'] \
+            / duration
+    track_points_per_second.unit = 'points/s'
+
+    def track_megabytes_per_second(self, n_points, tokenizer):
+        start = time.time()
+        Grid.parse_grid(self.path, tokenizer=tokenizer)
+        duration = time.time() - start
+        return os.path.getsize(self.path) / duration / 1024 ** 2
+    track_megabytes_per_second.unit = 'MiB/s'
+
+    def track_read_megabytes_per_second(self, n_points, tokenizer):
+        # The bandwidth of reading the file, as upper bound of the parser.
+        start = time.time()
+        with open(self.path, 'rb') as f:
+            while f.read(2 ** 24):
+                pass
+        duration = time.time() - start
+        return os.path.getsize(self.path) / duration / 1024 ** 2
+    track_read_megabytes_per_second.unit = 'MiB/s'
+
+
+class OrbitalAccess(object):
+    params = SIZES
+    param_names = ['n_points']
+    timeout = 3600
+
+    def setup(self, n_points):
+        self.grid = Grid.parse_grid(
+            cached_grid_file(n_points), orbitals=[], include_density=True)
+
+    def time_give_orbital_template(self, n_points):
+        self.grid._give_orbital_template()
+
+    # The cache of give_orbital is cleared, so this measures the latency
+    # of the first access, which builds the frame.
+    def time_give_orbital(self, n_points):
+        self.grid.orbital_cache.invalidate()
+        self.grid.give_orbital(1, 0).frame
+
+    def time_give_orbital_cached(self, n_points):
+        self.grid.give_orbital(1, 0).frame
@@ -0,0 +1,135 @@
+"""Synthetic ASCII MOLCAS grid files for the benchmarks.
+
+Run as a script to write a single file::
+
+    python benchmarks/synthetic.py out.grid --net 49 49 49 --n-grids 3
+"""
+from __future__ import division
+from __future__ import print_function
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+#: Bohr radius in Angstrom (CODATA 2018). Defined here, so the script
+#: runs without gridparser being importable.
+BOHR_TO_A = 0.529177210903
+
+#: Directory where :func:`cached_grid_file` keeps generated files.
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'gridparser_benchmarks')
+
+_VALUE_FORMAT = '{:18.10E}\n'
+
+
+def _write_values(f, values, chunk_size=2 ** 16):
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size].tolist()
+        f.write((_VALUE_FORMAT * len(chunk)).format(*chunk))
+
+
+def write_synthetic_grid(path, Natom=3, Net=(29, 29, 29), N_of_Grids=3,
+                         Block_Size=100000, density=True, seed=0):
+    """Write a valid ASCII MOLCAS grid file with random values.
+
+    Args:
+        path (str): Output file.
+        Natom (int): Number of hydrogen atoms placed along the
+            diagonal of the grid.
+        Net (tuple): Number of points minus one along each axis.
+        N_of_Grids (int): Number of grids including the density.
+        Block_Size (int): Number of points per block.
+        density (bool): If True, the first grid is the density.
+        seed (int): Seed of the random values.
+
+    Returns:
+        str: ``path``
+    """
+    rng = np.random.RandomState(seed)
+    Net = np.asarray(Net, dtype=int)
+    N_of_Points = int((Net + 1).prod())
+    N_Blocks = -(-N_of_Points // Block_Size)
+    Axis = np.diag(0.25 * (Net + 1))
+    Origin = -0.5 * Axis.diagonal()
+
+    titles = []
+    if density:
+        titles.append('Density')
+    n_orbitals = N_of_Grids - len(titles)
+    for i in range(n_orbitals):
+        symmetry = 1 + i % 2
+        titles.append('{0} {1} {2:.4f} ({3:.4f}) {4}'.format(
+            symmetry, 1 + i // 2, -1. + 0.1 * i,
+            2. if i < n_orbitals // 2 else 0., 1))
+
+    with open(path, 'w') as f:
+        f.write('9999902010 {0}\n'.format(N_of_Points))
+        f.write('# Synthetic MOLCAS grid file\n')
+        f.write('Natom= {0}\n'.format(Natom))
+        positions = np.linspace(0.2, 0.8, Natom)[:, None] * Axis.diagonal()
+        positions = (positions + Origin) * BOHR_TO_A
+        for i, (x, y, z) in enumerate(positions):
+            f.write('H{0} {1:.6f} {2:.6f} {3:.6f}\n'.format(i + 1, x, y, z))
+        f.write('VERSION=   2.0\n')
+        f.write('N_of_MO= {0}\n'.format(n_orbitals))
+        f.write('N_of_Grids= {0}\n'.format(N_of_Grids))
+        f.write('N_of_Points= {0}\n'.format(N_of_Points))
+        f.write('Block_Size= {0}\n'.format(Block_Size))
+        f.write('N_Blocks= {0}\n'.format(N_Blocks))
+        f.write('Is_cutoff= 0\n')
+        f.write('CutOff= 0.0\n')
+        f.write('N_P= {0}\n'.format(N_of_Points))
+        f.write('N_INDEX= 0 0 0 0 0 0 0\n')
+        f.write('Net= {0} {1} {2}\n'.format(*Net))
+        f.write('Origin= {0} {1} {2}\n'.format(*Origin))
+        for i in range(3):
+            f.write('Axis_{0}= {1} {2} {3}\n'.format(i + 1, *Axis[i]))
+        for title in titles:
+            f.write('GridName= {0}\n'.format(title))
+
+        for ib in range(N_Blocks):
+            n = min(Block_Size, N_of_Points - ib * Block_Size)
+            for title in titles:
+                values = rng.standard_normal(n)
+                if title == 'Density':
+                    values = np.abs(values)
+                f.write('Title= {0}\n'.format(title))
+                _write_values(f, values)
+    return path
+
+
+def cached_grid_file(n_points, N_of_Grids=3, **kwargs):
+    """Return a synthetic grid file with about ``n_points`` points.
+
+    The files are generated once and kept in :data:`CACHE_DIR`.
+    """
+    n = int(round(n_points ** (1 / 3)))
+    Net = (n - 1, n - 1, n - 1)
+    if not os.path.isdir(CACHE_DIR):
+        os.makedirs(CACHE_DIR)
+    path = os.path.join(CACHE_DIR, 'synthetic_{0}_{1}.grid'.format(
+        n ** 3, N_of_Grids))
+    if not os.path.exists(path):
+        write_synthetic_grid(path + '.part', Net=Net, N_of_Grids=N_of_Grids,
+                             **kwargs)
+        os.rename(path + '.part', path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--natom', type=int, default=3)
+    parser.add_argument('--net', type=int, nargs=3, default=[29, 29, 29])
+    parser.add_argument('--n-grids', type=int, default=3)
+    parser.add_argument('--block-size', type=int, default=100000)
+    parser.add_argument('--no-density', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_grid(args.path, Natom=args.natom, Net=args.net,
+                         N_of_Grids=args.n_grids, Block_Size=args.block_size,
+                         density=not args.no_density, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,4 +10,7 @@ def export(func):
         __all__ = [func.__name__]
     return func
 
+from . import orbital
+from . import parse_stats
 from . import gridparser
+from . import follow
@@ -0,0 +1,78 @@
+from __future__ import division
+from __future__ import absolute_import
+import collections
+
+
+class LRUCache(object):
+    """Cache that evicts the least recently used entries.
+
+    Args:
+        max_bytes (int): Budget for the sum of the sizes of the entries.
+            Entries larger than the budget are not cached.
+    """
+    def __init__(self, max_bytes):
+        self._entries = collections.OrderedDict()
+        self._max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self):
+        """The budget in bytes. Reducing it evicts entries at once."""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._evict()
+
+    def get(self, key):
+        """Return the cached value or ``None``."""
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, n_bytes):
+        """Cache ``value`` that uses ``n_bytes``."""
+        self.invalidate(key)
+        if n_bytes > self._max_bytes:
+            return
+        self._entries[key] = (value, n_bytes)
+        self.n_bytes += n_bytes
+        self._evict()
+
+    def invalidate(self, key=None):
+        """Remove ``key``, or all entries if it is ``None``."""
+        if key is None:
+            self._entries.clear()
+            self.n_bytes = 0
+        elif key in self._entries:
+            _, n_bytes = self._entries.pop(key)
+            self.n_bytes -= n_bytes
+
+    def _evict(self):
+        while self.n_bytes > self._max_bytes:
+            _, (_, n_bytes) = self._entries.popitem(last=False)
+            self.n_bytes -= n_bytes
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return the counters as dictionary."""
+        return {'entries': len(self), 'n_bytes': self.n_bytes,
+                'max_bytes': self._max_bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+    def __repr__(self):
+        return ('LRUCache({entries} entries, {n_bytes} of {max_bytes} bytes, '
+                '{hits} hits, {misses} misses, {evictions} evictions)'
+                ).format(**self.stats())
@@ -0,0 +1,36 @@
+from __future__ import division
+from __future__ import absolute_import
+import numpy as np
+
+
+def contract(orbitals, matrix, chunk_size=2**16, out=None):
+    """Return ``sum_ij matrix[i, j] * orbitals[i] * orbitals[j]``.
+
+    The points are processed in chunks. For every chunk the orbitals are
+    stacked to a ``(chunk_size, n)`` matrix :math:`\\Phi` and the result
+    is the rowwise dot product of :math:`\\Phi D` and :math:`\\Phi`,
+    so the work is one matrix product per chunk and linear in the
+    number of points.
+
+    Args:
+        orbitals (list): ``n`` one dimensional arrays of equal length.
+        matrix (numpy.ndarray): Shape ``(n, n)``.
+        chunk_size (int): Number of points per chunk.
+        out (numpy.ndarray): If given, the result is added to it.
+
+    Returns:
+        numpy.ndarray: One value per point.
+    """
+    matrix = np.asarray(matrix, dtype='f8')
+    if matrix.shape != (len(orbitals), len(orbitals)):
+        raise ValueError(
+            'The matrix has to have the shape ({0}, {0}).'.format(
+                len(orbitals)))
+    n_points = len(orbitals[0])
+    if out is None:
+        out = np.zeros(n_points)
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        phi = np.stack([values[start:stop] for values in orbitals], axis=1)
+        out[start:stop] += np.einsum('ij,ij->i', phi @ matrix, phi)
+    return out
@@ -0,0 +1,52 @@
+from __future__ import division
+from __future__ import absolute_import
+import numpy as np
+
+
+def coulomb_kernel(shape, basis):
+    """Return ``1 / |r|`` on the zero padded lattice.
+
+    The padded lattice has twice the number of points along each axis,
+    so a cyclic convolution with it equals the aperiodic one on the
+    original lattice. Row ``i`` of ``basis`` is the lattice vector of
+    axis ``i``, which handles non orthogonal cells.
+    The singularity at ``r = 0`` is replaced by the average of
+    ``1 / r`` over a sphere with the volume of one cell.
+    """
+    padded = [2 * n for n in shape]
+    r_squared = np.zeros(padded)
+    for component in range(3):
+        r = 0.
+        for i, n in enumerate(padded):
+            # Indices above n / 2 wrap around to negative displacements.
+            displacement = np.fft.fftfreq(n, 1. / n)
+            r = r + (displacement * basis[i, component]).reshape(
+                [-1 if j == i else 1 for j in range(3)])
+        r_squared += r ** 2
+    r_squared[0, 0, 0] = 1.
+    kernel = 1. / np.sqrt(r_squared)
+    volume = abs(np.linalg.det(basis))
+    radius = (3 * volume / (4 * np.pi)) ** (1 / 3)
+    kernel[0, 0, 0] = 2 * np.pi * radius ** 2 / volume
+    return kernel
+
+
+def hartree_potential(density, shape, basis):
+    """Solve the Poisson equation of an isolated charge distribution.
+
+    Args:
+        density (numpy.ndarray): Density in C-order of ``shape``.
+        shape (tuple): Number of points along each lattice axis.
+        basis (numpy.ndarray): Lattice vectors in Bohr as rows.
+
+    Returns:
+        numpy.ndarray: The potential with the same shape as
+        ``density``.
+    """
+    padded = [2 * n for n in shape]
+    volume = abs(np.linalg.det(basis))
+    transformed = np.fft.rfftn(density.reshape(shape), padded)
+    transformed *= np.fft.rfftn(coulomb_kernel(shape, basis))
+    potential = np.fft.irfftn(transformed, padded)
+    potential = potential[:shape[0], :shape[1], :shape[2]] * volume
+    return potential.reshape(density.shape)
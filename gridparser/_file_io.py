@@ -0,0 +1,235 @@
+from __future__ import with_statement
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import os
+import threading
+import time
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+#: Size of the decompressed chunks that are handed to the parser.
+CHUNK_SIZE = 4 * 1024 ** 2
+
+_MAGIC_NUMBERS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd')]
+
+
+def _zstd_open(raw):
+    try:
+        from compression import zstd
+        return zstd.ZstdFile(raw)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            'Reading zstd compressed grid files requires the zstandard '
+            'package.')
+    return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+
+
+_DECOMPRESSORS = {
+    'gzip': lambda raw: gzip.GzipFile(fileobj=raw),
+    'xz': lambda raw: lzma.LZMAFile(raw),
+    'bz2': lambda raw: bz2.BZ2File(raw),
+    'zstd': _zstd_open}
+
+
+def compression_of(stream):
+    """Return the name of the compression of a binary stream.
+
+    The stream has to support either ``peek`` or ``seek``.
+    Returns ``None`` for uncompressed data or if the stream
+    supports neither.
+    """
+    if hasattr(stream, 'peek'):
+        head = stream.peek(8)[:8]
+    elif stream.seekable():
+        position = stream.tell()
+        head = stream.read(8)
+        stream.seek(position)
+    else:
+        return None
+    for magic, name in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+class _PrefetchReader(io.RawIOBase):
+    """Read a stream in a background thread.
+
+    The decompressors of the standard library release the GIL, so
+    decompression of the next chunks overlaps with the tokenization of
+    the current one.
+    """
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, n_chunks=4):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._queue = queue.Queue(maxsize=n_chunks)
+        self._current = memoryview(b'')
+        self._exhausted = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self._stream.read(self._chunk_size)
+                self._queue.put(chunk)
+                if not chunk:
+                    break
+        except Exception as exception:
+            self._queue.put(exception)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._current:
+            if self._exhausted:
+                return 0
+            chunk = self._queue.get()
+            if isinstance(chunk, Exception):
+                self._exhausted = True
+                raise chunk
+            if not chunk:
+                self._exhausted = True
+                return 0
+            self._current = memoryview(chunk)
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            # Unblock the background thread if the queue is full.
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+            self._stream.close()
+        super(_PrefetchReader, self).close()
+
+
+@contextlib.contextmanager
+def open_grid_file(file):
+    """Open a grid file for binary, line wise reading.
+
+    Files compressed with gzip, xz, bz2 or zstd are detected by their
+    magic number and decompressed on the fly in a background thread.
+    Files opened here are closed on exit, file objects passed in are not.
+
+    Args:
+        file (str or file-like): Filename, path to file or an already
+            opened file object. Text streams are used unchanged.
+
+    Yields:
+        file-like: Stream to read the grid lines from.
+    """
+    to_close = []
+    try:
+        if hasattr(file, 'read'):
+            raw = file
+        else:
+            raw = open(file, 'rb')
+            to_close.append(raw)
+
+        compression = None
+        if not isinstance(raw, io.TextIOBase):
+            compression = compression_of(raw)
+        if compression is None:
+            yield raw
+        else:
+            stream = io.BufferedReader(
+                _PrefetchReader(_DECOMPRESSORS[compression](raw)),
+                buffer_size=CHUNK_SIZE)
+            to_close.append(stream)
+            yield stream
+    finally:
+        for stream in reversed(to_close):
+            stream.close()
+
+
+class TailReader(object):
+    """Read the lines of a file that is still being written.
+
+    :meth:`readline` only returns complete lines and waits for the
+    writer otherwise, so the parser never sees half written values.
+
+    Args:
+        path (str): The file. Waits for it to be created.
+        poll_interval (float): Seconds between checks for new data.
+        timeout (float): Raise :class:`TimeoutError` if there is no new
+            data for this many seconds. By default wait forever.
+        stop (threading.Event): Raise :class:`EOFError` when set.
+    """
+    def __init__(self, path, poll_interval=0.5, timeout=None, stop=None):
+        self._path = path
+        self._poll_interval = poll_interval
+        self._timeout = timeout
+        self._stop = stop
+        self._file = None
+        self._wait(lambda: os.path.exists(path))
+        self._file = open(path, 'rb')
+
+    def _wait(self, is_ready):
+        waited = 0.
+        while not is_ready():
+            if self._stop is not None and self._stop.is_set():
+                raise EOFError('Stopped following {0}.'.format(self._path))
+            if self._timeout is not None and waited >= self._timeout:
+                raise TimeoutError(
+                    'No new data in {0} for {1} s.'.format(
+                        self._path, self._timeout))
+            time.sleep(self._poll_interval)
+            waited += self._poll_interval
+
+    def readline(self):
+        parts = [self._file.readline()]
+
+        def is_complete():
+            if not parts[-1].endswith(b'\n'):
+                parts.append(self._file.readline())
+            return parts[-1].endswith(b'\n')
+        self._wait(is_complete)
+        return b''.join(parts)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+_COMPRESSED_OUTPUT = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+    '.bz2': bz2.open}
+
+
+def open_output_file(path):
+    """Open ``path`` for binary writing.
+
+    Files ending in ``.gz``, ``.xz`` or ``.bz2`` are compressed.
+    """
+    for extension, opener in _COMPRESSED_OUTPUT.items():
+        if path.endswith(extension):
+            return opener(path, 'wb')
+    return open(path, 'wb')
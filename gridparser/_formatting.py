@@ -0,0 +1,135 @@
+from __future__ import division
+from __future__ import absolute_import
+import numpy as np
+
+
+#: Largest ``precision`` of :func:`format_values`, the mantissa has to
+#: fit into 64 bit integers.
+MAX_PRECISION = 17
+
+_LOWEST, _HIGHEST = -120, 140
+_powers = None
+
+
+def _powers_of_ten():
+    """Return 10^k for ``_LOWEST <= k <= _HIGHEST`` as double-double."""
+    global _powers
+    if _powers is None:
+        from fractions import Fraction
+        high = np.zeros(_HIGHEST - _LOWEST + 1)
+        low = np.zeros_like(high)
+        for i, k in enumerate(range(_LOWEST, _HIGHEST + 1)):
+            exact = Fraction(10) ** k
+            high[i] = float(exact)
+            low[i] = float(exact - Fraction(high[i]))
+        _powers = high, low
+    return _powers
+
+
+def _split(a):
+    t = (2. ** 27 + 1.) * a
+    high = t - (t - a)
+    return high, a - high
+
+
+def _scaled_digits(magnitude, k):
+    """Return ``magnitude * 10^k`` rounded to integers.
+
+    The product is computed as double-double with Dekker's exact
+    multiplication. The second return value is False where the product
+    is too close to a midpoint between two integers to be rounded
+    correctly.
+    """
+    high, low = _powers_of_ten()
+    index = np.clip(k, _LOWEST, _HIGHEST) - _LOWEST
+    power, power_low = high[index], low[index]
+    product = magnitude * power
+    a_high, a_low = _split(magnitude)
+    b_high, b_low = _split(power)
+    error = (((a_high * b_high - product) + a_high * b_low + a_low * b_high)
+             + a_low * b_low) + magnitude * power_low
+    result = product + error
+    rest = (product - result) + error
+    integer = np.floor(result)
+    fraction = (result - integer) + rest
+    carry = np.floor(fraction)
+    fraction -= carry
+    digits = integer.astype('i8') + carry.astype('i8') + (fraction > 0.5)
+    is_exact = np.abs(fraction - 0.5) > 2. ** -90 * result
+    return digits, is_exact
+
+
+def format_values(values, precision=10):
+    """Format values as lines of ``'%{width}.{precision}E\\n'``, vectorized.
+
+    The width is ``precision + 8``, which gives ``'%18.10E'`` for the
+    default precision. The digits are computed with double-double and
+    integer arithmetic on whole arrays instead of formatting every value
+    in Python. Values that are not finite, have an exponent with three
+    digits or lie too close to a rounding midpoint are formatted with
+    Python, which gives the same width. The output equals Python's
+    formatting.
+
+    Args:
+        values (numpy.ndarray): One dimensional array.
+        precision (int): Number of digits after the decimal point,
+            between 1 and :data:`MAX_PRECISION`.
+
+    Returns:
+        bytes: One line per value.
+    """
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError('precision has to be between 1 and {0}.'.format(
+            MAX_PRECISION))
+    width = precision + 8
+    values = np.asarray(values, dtype='f8')
+    n = len(values)
+    magnitude = np.abs(values)
+    is_nonzero = np.isfinite(values) & (magnitude > 0.)
+    exponent = np.zeros(n, dtype='i8')
+    exponent[is_nonzero] = np.floor(np.log10(magnitude[is_nonzero]))
+    is_simple = np.isfinite(values) & (np.abs(exponent) <= 100)
+    magnitude = np.where(is_simple, magnitude, 0.)
+    mantissa, is_exact = _scaled_digits(magnitude, precision - exponent)
+    # log10 may be off by one close to powers of ten,
+    # and rounding may give 10.0000000000
+    too_large = mantissa >= 10 ** (precision + 1)
+    too_small = is_nonzero & (mantissa < 10 ** precision)
+    exponent[too_large] += 1
+    exponent[too_small] -= 1
+    fix = too_large | too_small
+    mantissa[fix], is_exact[fix] = _scaled_digits(
+        magnitude[fix], precision - exponent[fix])
+    is_simple &= is_exact
+    is_simple &= np.abs(exponent) < 100
+
+    # The columns are filled in a (width + 1, n) array, so every write
+    # is contiguous, and transposed at the end.
+    columns = np.empty((width + 1, n), dtype='u1')
+    columns[0] = ord(' ')
+    columns[1] = np.where(np.signbit(values), ord('-'), ord(' '))
+    columns[3] = ord('.')
+    # Splitting the mantissa allows 32 bit integer arithmetic.
+    n_lower = precision // 2 + 1
+    upper, lower = np.divmod(mantissa, 10 ** n_lower)
+    positions = [2] + list(range(4, precision + 4))
+    for part, part_positions in [(lower, positions[-n_lower:]),
+                                 (upper, positions[:-n_lower])]:
+        part = part.astype('u4')
+        for position in reversed(part_positions):
+            quotient = part // 10
+            columns[position] = part - quotient * 10 + ord('0')
+            part = quotient
+    columns[precision + 4] = ord('E')
+    columns[precision + 5] = np.where(exponent < 0, ord('-'), ord('+'))
+    exponent = np.abs(exponent)
+    columns[precision + 6] = exponent // 10 % 10 + ord('0')
+    columns[precision + 7] = exponent % 10 + ord('0')
+    columns[width] = ord('\n')
+    lines = columns.T
+    if not is_simple.all():
+        template = '{{0:{0}.{1}E}}\n'.format(width, precision)
+        for i in np.flatnonzero(~is_simple):
+            line = template.format(values[i]).encode()
+            lines[i] = np.frombuffer(line, dtype='u1')
+    return lines.tobytes()
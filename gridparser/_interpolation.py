@@ -0,0 +1,31 @@
+from __future__ import division
+from __future__ import absolute_import
+import itertools
+import numpy as np
+
+
+def trilinear(values, fractional, fill_value=0.):
+    """Interpolate values given on a lattice at fractional coordinates.
+
+    Args:
+        values (numpy.ndarray): Values with the shape of the lattice.
+        fractional (numpy.ndarray): Shape ``(n, 3)`` in units of the
+            lattice vectors, i.e. ``(i, j, k)`` is a lattice point.
+        fill_value (float): Value for points outside of the lattice.
+
+    Returns:
+        numpy.ndarray: Shape ``(n,)``.
+    """
+    upper = np.array(values.shape) - 1
+    lower = np.clip(np.floor(fractional).astype(int), 0,
+                    np.maximum(upper - 1, 0))
+    t = fractional - lower
+    result = np.zeros(len(fractional))
+    for corner in itertools.product((0, 1), repeat=3):
+        index = np.minimum(lower + corner, upper)
+        weight = np.prod(np.where(corner, t, 1. - t), axis=1)
+        result += weight * values[index[:, 0], index[:, 1], index[:, 2]]
+    eps = 1e-8
+    is_inside = ((fractional >= -eps) & (fractional <= upper + eps)).all(axis=1)
+    result[~is_inside] = fill_value
+    return result
@@ -0,0 +1,204 @@
+"""Numba kernels of :mod:`gridparser._tokenize`.
+
+This module is only imported if the numba tokenizer is used.
+"""
+from __future__ import division
+from __future__ import absolute_import
+import math
+import numba
+import numpy as np
+
+
+def _powers_of_ten(lowest, highest):
+    """Return 10^e for ``lowest <= e <= highest`` as double-double."""
+    from fractions import Fraction
+    high = np.zeros(highest - lowest + 1)
+    low = np.zeros_like(high)
+    for i, e in enumerate(range(lowest, highest + 1)):
+        exact = Fraction(10) ** e
+        high[i] = float(exact)
+        low[i] = float(exact - Fraction(high[i]))
+    return high, low
+
+
+_LOWEST, _HIGHEST = -360, 308
+_POWERS_HIGH, _POWERS_LOW = _powers_of_ten(_LOWEST, _HIGHEST)
+# Powers up to 10^22 are exact, so one multiplication or division
+# by them is correctly rounded.
+_EXACT_POWERS = 10. ** np.arange(23)
+_SPLITTER = 2. ** 27 + 1.
+_NAN = np.frombuffer(b'nan', dtype='u1')
+_INF = np.frombuffer(b'inf', dtype='u1')
+_INFINITY = np.frombuffer(b'infinity', dtype='u1')
+# Bound of the relative error of the double-double product in scale.
+_TOLERANCE = 2. ** -96
+
+
+@numba.njit(cache=True)
+def scale(mantissa, exponent):
+    """Return ``mantissa * 10^exponent`` and whether it is exact.
+
+    The value is rounded like ``float``, if the second return value is
+    ``True``. Otherwise it may be off by one unit in the last place and
+    the caller has to convert the number in another way. This happens
+    for results that lie (almost) exactly halfway between two floats,
+    for results below 1e-290 and for overflows.
+    """
+    if mantissa == 0:
+        return 0., True
+    if mantissa < 2 ** 53 and -22 <= exponent <= 22:
+        if exponent >= 0:
+            return mantissa * _EXACT_POWERS[exponent], True
+        return mantissa / _EXACT_POWERS[-exponent], True
+    if exponent < _LOWEST or exponent > _HIGHEST:
+        return 0., False
+    # Product of the mantissa and the power of ten, both as
+    # double-double, using Dekker's exact multiplication.
+    a = float(mantissa)
+    a_rest = float(mantissa - np.int64(a))
+    b = _POWERS_HIGH[exponent - _LOWEST]
+    product = a * b
+    t = _SPLITTER * a
+    a_high = t - (t - a)
+    a_low = a - a_high
+    t = _SPLITTER * b
+    b_high = t - (t - b)
+    b_low = b - b_high
+    error = (((a_high * b_high - product) + a_high * b_low + a_low * b_high)
+             + a_low * b_low)
+    error += a * _POWERS_LOW[exponent - _LOWEST] + a_rest * b
+    result = product + error
+    if not math.isfinite(result) or result < 1e-290:
+        # Overflows and (almost) subnormal results.
+        return result, False
+    # result is correctly rounded, unless the exact product may lie on
+    # the other side of the midpoint to a neighbouring float.
+    rest = (product - result) + error
+    fraction, binary_exponent = math.frexp(result)
+    half_gap = math.ldexp(1., binary_exponent - 54)
+    if fraction == 0.5 and rest < 0:
+        # The gap below a power of two is half as large.
+        half_gap /= 2
+    return result, abs(rest) + _TOLERANCE * result < half_gap
+
+
+@numba.njit(cache=True)
+def _match(buffer, i, end, word):
+    """Return the end of the lower case ``word`` at ``i`` or -1."""
+    if end - i < len(word):
+        return -1
+    for j in range(len(word)):
+        if buffer[i + j] | 32 != word[j]:
+            return -1
+    return i + len(word)
+
+
+@numba.njit(cache=True)
+def parse_line(buffer, i, end):
+    """Parse the number in the line that starts at ``i``.
+
+    Returns the value, the start of the next line, which is -1 if
+    the line is not complete within ``buffer[:end]``, and whether the
+    value is rounded like ``float``. Only a subset of the syntax of
+    ``float`` is parsed. For all other lines, valid or not, the last
+    return value is False as well, so that ``float`` converts them or
+    raises exactly as on the numpy path.
+    """
+    while i < end and (buffer[i] == 32 or buffer[i] == 9):
+        i += 1
+    negative = False
+    if i < end and (buffer[i] == 45 or buffer[i] == 43):
+        negative = buffer[i] == 45
+        i += 1
+    mantissa = 0
+    n_digits = 0
+    exponent = 0
+    is_valid = False
+    is_fraction = False
+    is_truncated = False
+    while i < end:
+        c = buffer[i]
+        if 48 <= c <= 57:
+            is_valid = True
+            # Digits beyond the precision of int64 only scale.
+            if n_digits < 18:
+                mantissa = 10 * mantissa + (c - 48)
+                if mantissa > 0:
+                    n_digits += 1
+                if is_fraction:
+                    exponent -= 1
+            else:
+                is_truncated = is_truncated or c != 48
+                if not is_fraction:
+                    exponent += 1
+        elif c == 46 and not is_fraction:
+            is_fraction = True
+        else:
+            break
+        i += 1
+    special = 0.
+    if not is_valid and not is_fraction:
+        # nan, inf or infinity, ignoring case
+        for word, value in ((_NAN, np.nan), (_INFINITY, np.inf),
+                            (_INF, np.inf)):
+            stop = _match(buffer, i, end, word)
+            if stop != -1:
+                special = value
+                is_valid = True
+                i = stop
+                break
+    elif is_valid and i < end and (buffer[i] | 32) == 101:
+        i += 1
+        exponent_negative = False
+        if i < end and (buffer[i] == 45 or buffer[i] == 43):
+            exponent_negative = buffer[i] == 45
+            i += 1
+        value = 0
+        n_exponent_digits = 0
+        while i < end and 48 <= buffer[i] <= 57:
+            # Larger exponents over- or underflow anyway.
+            if value < 100000:
+                value = 10 * value + (buffer[i] - 48)
+            n_exponent_digits += 1
+            i += 1
+        is_valid = n_exponent_digits > 0
+        exponent += -value if exponent_negative else value
+    while i < end and (buffer[i] == 32 or buffer[i] == 9 or buffer[i] == 13):
+        i += 1
+    if i == end or buffer[i] != 10 or not is_valid:
+        return 0., -1, False
+    if special != 0.:
+        result, is_exact = special, True
+    else:
+        result, is_exact = scale(mantissa, exponent)
+    return -result if negative else result, i + 1, is_exact and not is_truncated
+
+
+@numba.njit(cache=True)
+def parse_lines(buffer, position, n_lines, out):
+    """Parse up to ``n_lines`` complete lines into ``out``.
+
+    Returns the new position and the number of parsed lines. Parsing
+    stops early at the end of ``buffer`` and before a complete line
+    that :func:`parse_line` leaves to ``float``.
+    """
+    end = len(buffer)
+    for line in range(n_lines):
+        value, next_line, is_exact = parse_line(buffer, position, end)
+        if next_line == -1 or not is_exact:
+            return position, line
+        out[line] = value
+        position = next_line
+    return position, n_lines
+
+
+@numba.njit(cache=True)
+def skip_lines(buffer, position, n_lines):
+    end = len(buffer)
+    for line in range(n_lines):
+        while position < end and buffer[position] != 10:
+            position += 1
+        if position == end:
+            return position, line
+        position += 1
+    return position, n_lines
@@ -10,7 +10,6 @@ from __future__ import unicode_literals
 #except ImportError:
 #    pass
 import numpy as np
-import pandas as pd
 # import collections
 # import copy
 from . import export
@@ -28,6 +27,8 @@ class Core(object):
     # self.copy
     # So you have to provide it in the __init__ of an inheriting class.
     # Look into ./xyz_functions.py for an example.
+    # Empty, so that subclasses with __slots__ have no instance __dict__.
+    __slots__ = ()
 
     def __len__(self):
         return self.n_atoms
@@ -0,0 +1,67 @@
+from __future__ import division
+from __future__ import absolute_import
+import numpy as np
+
+
+def _becke_step(mu):
+    for _ in range(3):
+        mu = 1.5 * mu - 0.5 * mu ** 3
+    return 0.5 * (1. - mu)
+
+
+def becke_weights(points, atoms):
+    """Return the weights of the fuzzy Becke cells of ``atoms``.
+
+    Args:
+        points (numpy.ndarray): Shape ``(n_points, 3)``.
+        atoms (numpy.ndarray): Shape ``(n_atoms, 3)``.
+
+    Returns:
+        numpy.ndarray: Shape ``(n_points, n_atoms)``, every row sums to one.
+    """
+    distance = np.linalg.norm(points[:, None, :] - atoms[None, :, :], axis=2)
+    if len(atoms) == 1:
+        return np.ones_like(distance)
+    separation = np.linalg.norm(atoms[:, None, :] - atoms[None, :, :], axis=2)
+    np.fill_diagonal(separation, np.inf)
+    mu = (distance[:, :, None] - distance[:, None, :]) / separation
+    step = _becke_step(mu)
+    diagonal = np.arange(len(atoms))
+    step[:, diagonal, diagonal] = 1.
+    cell = step.prod(axis=2)
+    return cell / cell.sum(axis=1)[:, None]
+
+
+def populations(chunks, atoms, volume, method='voronoi'):
+    """Integrate densities over atomic cells.
+
+    Args:
+        chunks (iterable): Tuples ``(points, densities)`` with the points
+            in Bohr of shape ``(n, 3)`` and the densities of shape
+            ``(n_densities, n)``.
+        atoms (numpy.ndarray): Positions of the atoms in Bohr.
+        volume (float): Volume of one lattice cell in Bohr\\ :sup:`3`.
+        method (str): ``'voronoi'`` assigns every point to the nearest
+            atom using a KD-tree, ``'becke'`` uses the smooth
+            weights of :func:`becke_weights`.
+
+    Returns:
+        numpy.ndarray: Shape ``(n_densities, n_atoms)``.
+    """
+    if method == 'voronoi':
+        from scipy.spatial import cKDTree
+        tree = cKDTree(atoms)
+    elif method != 'becke':
+        raise ValueError("method has to be 'voronoi' or 'becke'.")
+    result = None
+    for points, densities in chunks:
+        if result is None:
+            result = np.zeros([len(densities), len(atoms)])
+        if method == 'voronoi':
+            _, owner = tree.query(points)
+            for i, density in enumerate(densities):
+                result[i] += np.bincount(owner, weights=density,
+                                         minlength=len(atoms))
+        else:
+            result += densities @ becke_weights(points, atoms)
+    return result * volume
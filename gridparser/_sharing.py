@@ -0,0 +1,113 @@
+from __future__ import division
+from __future__ import absolute_import
+import weakref
+import numpy as np
+
+#: Alignment of the arrays in bytes.
+_ALIGNMENT = 64
+
+
+def _attach_shared_memory(name):
+    from multiprocessing import shared_memory
+    try:
+        # Only the creating process unlinks the block.
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no ``track`` argument.
+        return shared_memory.SharedMemory(name=name)
+
+
+class _Mapping(object):
+    """Owner of a shared memory block or memory mapped file.
+
+    Every array of :class:`SharedArrays` is a view of this object, so
+    the mapping is closed only after the last array is garbage
+    collected.
+    """
+    def __init__(self, memory, buffer, size):
+        self.memory = memory
+        # The address is taken from a temporary array, which does not
+        # keep an export of the buffer that would block closing.
+        address = np.frombuffer(buffer, dtype='u1', count=size).ctypes.data
+        self.__array_interface__ = {
+            'shape': (size,), 'typestr': '|u1', 'data': (address, False),
+            'version': 3}
+
+
+class SharedArrays(object):
+    """Arrays in one block of shared memory or one memory mapped file.
+
+    Pickling an instance only pickles the name of the block or the path
+    of the file together with the layout, and unpickling attaches to the
+    same memory. Writes to the arrays are seen by all processes.
+
+    Args:
+        layout (list): Tuples ``(key, dtype, shape, offset)``.
+        name (str): Name of the shared memory block.
+        path (str): Path of the memory mapped file.
+    """
+    def __init__(self, layout, name=None, path=None, _memory=None):
+        self.layout = layout
+        self.name = name
+        self.path = path
+        size = max([0] + [offset + np.dtype(dtype).itemsize * int(np.prod(shape))
+                          for _, dtype, shape, offset in layout])
+        if _memory is not None:
+            memory, buffer = _memory, _memory.buf
+        elif path is None:
+            memory = _attach_shared_memory(name)
+            buffer = memory.buf
+        else:
+            memory = buffer = np.memmap(path, dtype='u1', mode='r+',
+                                        shape=(max(size, 1),))
+        base = np.asarray(_Mapping(memory, buffer, max(size, 1)))
+        self.arrays = {}
+        for key, dtype, shape, offset in layout:
+            n_bytes = np.dtype(dtype).itemsize * int(np.prod(shape))
+            self.arrays[key] = base[offset:offset + n_bytes].view(
+                dtype).reshape(shape)
+
+    @classmethod
+    def create(cls, arrays, path=None):
+        """Copy ``arrays`` into new shared memory.
+
+        Args:
+            arrays (dict): The arrays to share.
+            path (str): If given, a file of this name is memory mapped
+                instead of allocating a block of shared memory.
+
+        Returns:
+            SharedArrays:
+        """
+        layout, size = [], 0
+        for key, array in arrays.items():
+            size = -(-size // _ALIGNMENT) * _ALIGNMENT
+            layout.append((key, array.dtype.str, array.shape, size))
+            size += array.nbytes
+        if path is None:
+            from multiprocessing import shared_memory
+            memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            shared = cls(layout, name=memory.name, _memory=memory)
+            # The creating process unlinks the block when the instance
+            # is garbage collected.
+            shared._finalizer = weakref.finalize(shared, memory.unlink)
+        else:
+            np.memmap(path, dtype='u1', mode='w+', shape=(max(size, 1),)).flush()
+            shared = cls(layout, path=path)
+        for key, array in arrays.items():
+            shared.arrays[key][...] = array
+        return shared
+
+    def release(self):
+        """Unlink the shared memory block, if this process created it.
+
+        Existing arrays stay valid and the memory is freed after the
+        last of them is garbage collected. Memory mapped files are not
+        removed.
+        """
+        finalizer = getattr(self, '_finalizer', None)
+        if finalizer is not None:
+            finalizer()
+
+    def __reduce__(self):
+        return (type(self), (self.layout, self.name, self.path))
@@ -0,0 +1,134 @@
+from __future__ import division
+from __future__ import absolute_import
+import importlib.util
+import numpy as np
+
+#: Number of values from which ``tokenizer='auto'`` uses Numba,
+#: because importing and compiling takes about a second.
+NUMBA_MIN_VALUES = 10 ** 6
+
+#: Size of the chunks that :class:`BlockReader` reads.
+CHUNK_SIZE = 4 * 1024 ** 2
+
+_kernels = None
+
+
+def numba_available():
+    """Return whether Numba is installed, without importing it."""
+    return importlib.util.find_spec('numba') is not None
+
+
+def choose_tokenizer(tokenizer, f, n_values):
+    """Return ``'numba'`` or ``'numpy'`` for the ``tokenizer`` argument.
+
+    Args:
+        tokenizer (str): ``'auto'``, ``'numba'`` or ``'numpy'``.
+        f (file-like): The stream. Numba needs a binary stream with
+            ``read``.
+        n_values (int): Number of values that are converted.
+    """
+    if tokenizer not in ('auto', 'numba', 'numpy'):
+        raise ValueError("tokenizer has to be 'auto', 'numba' or 'numpy'.")
+    is_binary = hasattr(f, 'read') and isinstance(f.read(0), bytes)
+    if tokenizer == 'numba':
+        if not is_binary:
+            raise ValueError('The numba tokenizer needs a binary stream.')
+        if not numba_available():
+            raise ImportError('The numba tokenizer requires numba.')
+    if tokenizer == 'auto':
+        use_numba = (is_binary and n_values >= NUMBA_MIN_VALUES
+                     and numba_available())
+        tokenizer = 'numba' if use_numba else 'numpy'
+    return tokenizer
+
+
+def _compile():
+    global _kernels
+    if _kernels is None:
+        from . import _numba_kernels
+        _kernels = (_numba_kernels.parse_lines, _numba_kernels.skip_lines)
+    return _kernels
+
+
+class BlockReader(object):
+    """Read the blocks of a grid file with compiled kernels.
+
+    The lines of a block are parsed directly from the bytes read from
+    the file, without creating Python strings for them.
+
+    Args:
+        f (file-like): Binary stream positioned at the first block.
+    """
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self._parse_lines, self._skip_lines = _compile()
+        self._f = f
+        self._chunk_size = chunk_size
+        self._data = b''
+        self._position = 0
+
+    def _refill(self):
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            if self._data[self._position:] and not self._data.endswith(b'\n'):
+                # The last line of the file has no newline.
+                chunk = b'\n'
+            else:
+                raise ValueError('The grid file ended unexpectedly.')
+        self._data = self._data[self._position:] + chunk
+        self._position = 0
+
+    def readline(self):
+        """Return the next line as bytes."""
+        while True:
+            stop = self._data.find(b'\n', self._position)
+            if stop != -1:
+                line = self._data[self._position:stop + 1]
+                self._position = stop + 1
+                return line
+            self._refill()
+
+    def _apply(self, kernel, n_lines, *args):
+        done, n_bytes = 0, 0
+        while True:
+            buffer = np.frombuffer(self._data, dtype='u1')
+            position, parsed = kernel(
+                buffer, self._position, n_lines - done,
+                *[arg[done:] for arg in args])
+            n_bytes += position - self._position
+            self._position = position
+            done += parsed
+            if done == n_lines:
+                return n_bytes
+            if self._data.find(b'\n', self._position) == -1:
+                self._refill()
+            else:
+                # The kernel stopped before a line that it can not
+                # parse or round correctly, so float converts it or
+                # raises the same error as the numpy path.
+                line = self.readline()
+                n_bytes += len(line)
+                args[0][done] = float(line)
+                done += 1
+
+    def skip_lines(self, n_lines):
+        """Skip lines and return the number of bytes."""
+        return self._apply(self._skip_lines, n_lines)
+
+    def read_values(self, n_lines, out, selection=None):
+        """Parse one value per line into ``out``.
+
+        Args:
+            n_lines (int): Number of lines.
+            out (numpy.ndarray): Output with one value per line or per
+                selected line.
+            selection (numpy.ndarray): Indices of the lines to keep.
+
+        Returns:
+            int: Number of bytes read.
+        """
+        if selection is None:
+            return self._apply(self._parse_lines, n_lines, out)
+        values = np.empty(n_lines, dtype=out.dtype)
+        n_bytes = self._apply(self._parse_lines, n_lines, values)
+        out[:] = values[selection]
+        return n_bytes
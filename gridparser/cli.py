@@ -0,0 +1,223 @@
+"""Convert and inspect MOLCAS grid files.
+
+Installed as the ``gridparser`` console script::
+
+    gridparser info *.grid
+    gridparser convert -j 8 --format cube --orbitals 1:5 1:6 *.grid.gz
+
+Every file is parsed and written by one worker process, so at most one
+file is held in memory per worker. Results are printed as soon as a
+file is done.
+"""
+from __future__ import with_statement
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import argparse
+import os
+import sys
+import numpy as np
+from .gridparser import Grid, _lattice
+
+FORMATS = ('npy', 'cube', 'compact')
+
+_SUFFIXES = ('.gz', '.xz', '.bz2', '.zst', '.grid', '.lus')
+
+
+def _orbital_key(string):
+    try:
+        symmetry_char, iorb = string.split(':')
+        return int(symmetry_char), int(iorb)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Orbitals are given as 'symmetry:number', e.g. '1:5'.")
+
+
+def _stem(path):
+    name = os.path.basename(path)
+    for suffix in _SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+def _same_outputs(paths, output_dir=None):
+    """Return the groups of ``paths`` that would give the same outputs."""
+    groups = {}
+    for path in paths:
+        directory = os.path.dirname(path) if output_dir is None else output_dir
+        stem = os.path.normpath(os.path.join(directory, _stem(path)))
+        groups.setdefault(stem, []).append(path)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _name_of(symmetry_char, iorb):
+    return 'density' if (symmetry_char, iorb) == (1, 0) else '{0}_{1}'.format(
+        symmetry_char, iorb)
+
+
+def summary(path):
+    """Return a summary of the header of a grid file as string."""
+    header = Grid.parse_header(path)
+    metadata = header['metadata']
+    shape, _ = _lattice(metadata)
+    lines = [path,
+             '  {0} atoms, {1} points ({2}), {3} blocks of {4}'.format(
+                 metadata['Natom'], metadata['N_of_Points'],
+                 ' x '.join(str(n) for n in shape), metadata['N_Blocks'],
+                 metadata['Block_Size'])]
+    for symmetry_char in sorted(header['orbitals_metadata']):
+        for iorb, orbital in sorted(
+                header['orbitals_metadata'][symmetry_char].items()):
+            if (symmetry_char, iorb) == (1, 0):
+                lines.append('  density')
+            else:
+                lines.append('  {0}:{1}  energy {2: .6f}  occupation '
+                             '{3:.4f}  {4}'.format(
+                                 symmetry_char, iorb, orbital['energy'],
+                                 orbital['occupation'], orbital['status']))
+    return '\n'.join(lines)
+
+
+def convert(path, file_format='npy', output_dir=None, orbitals=None,
+            include_density=True, dtype='f8'):
+    """Convert a grid file.
+
+    Args:
+        path (str): The grid file.
+        file_format (str): ``'npy'`` writes one ``.npy`` file per
+            orbital with the shape of the lattice, ``'cube'`` one
+            Gaussian cube file per orbital and ``'compact'`` one
+            compressed ``.npz`` file with all orbitals and the lattice.
+        output_dir (str): Directory of the output files.
+            By default the directory of ``path``.
+        orbitals (list): ``(symmetry_char, iorb)`` tuples to extract.
+            By default all orbitals are converted.
+        include_density (bool): Convert the density.
+        dtype (str): Floating point type of ``.npy`` and ``.npz`` files.
+
+    Returns:
+        list: The written files.
+    """
+    if file_format not in FORMATS:
+        raise ValueError('file_format has to be one of {0}.'.format(FORMATS))
+    grid = Grid.parse_grid(path, dtype=dtype, orbitals=orbitals,
+                           include_density=include_density)
+    if output_dir is None:
+        output_dir = os.path.dirname(path)
+    stem = os.path.join(output_dir, _stem(path))
+    shape, basis = _lattice(grid.metadata)
+    keys = [(symmetry_char, iorb)
+            for symmetry_char in sorted(grid._orbitals)
+            for iorb in sorted(grid._orbitals[symmetry_char])]
+    written = []
+    if file_format == 'compact':
+        arrays = dict(
+            (_name_of(*key), grid._orbitals[key[0]][key[1]].reshape(shape))
+            for key in keys)
+        written.append(stem + '.npz')
+        np.savez_compressed(
+            written[-1], origin=grid.metadata['Origin'], basis=basis,
+            **arrays)
+        return written
+    for key in keys:
+        if file_format == 'npy':
+            written.append('{0}_{1}.npy'.format(stem, _name_of(*key)))
+            np.save(written[-1],
+                    grid._orbitals[key[0]][key[1]].reshape(shape))
+        else:
+            written.append('{0}_{1}.cube'.format(stem, _name_of(*key)))
+            grid.write_cube(written[-1], *key)
+    return written
+
+
+def _convert_and_report(path, **kwargs):
+    return '\n'.join(['{0} ->'.format(path)] + [
+        '  ' + output for output in convert(path, **kwargs)])
+
+
+def _run(function, paths, jobs, **kwargs):
+    """Yield ``(path, result, error)`` in the order the files are done."""
+    if jobs == 1:
+        for path in paths:
+            try:
+                yield path, function(path, **kwargs), None
+            except Exception as error:
+                yield path, None, error
+        return
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(jobs) as executor:
+        futures = dict((executor.submit(function, path, **kwargs), path)
+                       for path in paths)
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as error:
+                yield futures[future], None, error
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='gridparser', description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    info = commands.add_parser(
+        'info', help='Print a summary of the header of grid files.')
+    convert = commands.add_parser(
+        'convert', help='Convert grid files or extract orbitals.')
+    for command in (info, convert):
+        command.add_argument('files', nargs='+', metavar='FILE')
+        command.add_argument(
+            '-j', '--jobs', type=int, default=1,
+            help='Number of worker processes (default: 1).')
+    convert.add_argument(
+        '-f', '--format', choices=FORMATS, default='npy',
+        help='Output format (default: npy).')
+    convert.add_argument(
+        '-o', '--output-dir',
+        help='Directory of the output (default: next to the input).')
+    convert.add_argument(
+        '--orbitals', nargs='+', type=_orbital_key, metavar='SYM:N',
+        help='Only convert these orbitals, e.g. 1:5 2:1.')
+    convert.add_argument(
+        '--no-density', action='store_true', help='Skip the density.')
+    convert.add_argument(
+        '--dtype', default='f8', help='Floating point type (default: f8).')
+    return parser
+
+
+def main(argv=None):
+    """Run the command line interface and return the exit status."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.command == 'info':
+        results = _run(summary, args.files, args.jobs)
+    else:
+        for group in _same_outputs(args.files, args.output_dir):
+            # Their outputs would overwrite each other, with -j even
+            # concurrently.
+            parser.error('{0} would be converted to the same files, '
+                         'convert them with different --output-dir.'.format(
+                             ', '.join(group)))
+        if args.output_dir is not None and not os.path.isdir(args.output_dir):
+            os.makedirs(args.output_dir)
+        results = _run(
+            _convert_and_report, args.files, args.jobs,
+            file_format=args.format, output_dir=args.output_dir,
+            orbitals=args.orbitals, include_density=not args.no_density,
+            dtype=args.dtype)
+    status = 0
+    for path, result, error in results:
+        if error is None:
+            print(result)
+        else:
+            print('{0}: {1}'.format(path, error), file=sys.stderr)
+            status = 1
+        sys.stdout.flush()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+from __future__ import with_statement
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import threading
+from . import export
+from ._file_io import TailReader
+from .gridparser import Grid
+
+
+@export
+class GridFollower(object):
+    """Parse a grid file while MOLCAS is still writing it.
+
+    The header and title lines are parsed as soon as they are written,
+    then every block as soon as it is complete. Parsing runs in a
+    background thread and the file is read only once.
+    Compressed files can not be followed.
+
+    Example::
+
+        follower = GridFollower('molecule.grid')
+        grid = follower.wait_for_grid()
+        while follower.wait(follower.blocks_done + 1):
+            density = grid.give_orbital(1, 0).values[:follower.points_filled]
+
+    Args:
+        path (str): The grid file. It does not have to exist yet.
+        poll_interval (float): Seconds between checks for new data.
+        timeout (float): Give up if the file does not grow for this
+            many seconds. By default wait until :meth:`stop` is called.
+        callback (callable): Called with the follower after every block,
+            from the parsing thread.
+        **kwargs: Passed to :meth:`Grid.parse_grid`, e.g. ``orbitals``,
+            ``dtype``, ``region`` or ``preview``.
+
+    Attributes:
+        grid (Grid): The grid being filled, ``None`` until the title
+            lines are parsed. Only the values of the first
+            :attr:`points_filled` points are valid.
+        blocks_done (int): Number of parsed blocks.
+        points_filled (int): Number of points whose values are parsed.
+        stats (ParseStats): Statistics of the parse.
+        error (Exception): The exception that ended parsing early.
+    """
+    def __init__(self, path, poll_interval=0.5, timeout=None, callback=None,
+                 **kwargs):
+        self.grid = None
+        self.blocks_done = 0
+        self.points_filled = 0
+        self.stats = None
+        self.error = None
+        self._finished = False
+        self._complete = False
+        self._callback = callback
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(path, poll_interval, timeout, kwargs))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, path, poll_interval, timeout, kwargs):
+        arguments = dict(
+            dtype='f8', orbitals=None, include_density=True, region=None,
+            region_atoms=None, region_margin=0., preview=None)
+        arguments.update(kwargs)
+        f = None
+        try:
+            f = TailReader(path, poll_interval, timeout, self._stop)
+            Grid._parse_grid(f, progress=self._progress, **arguments)
+            self._complete = True
+        except Exception as error:
+            self.error = error
+        finally:
+            if f is not None:
+                f.close()
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def _progress(self, stats):
+        with self._condition:
+            self.stats = stats
+            if self.grid is None:
+                self.grid = stats.grid
+            self.blocks_done = stats.blocks_done
+            self.points_filled = stats.points_filled
+            self._condition.notify_all()
+        if stats.blocks_done and self._callback is not None:
+            self._callback(self)
+
+    @property
+    def finished(self):
+        """``True`` if the whole file is parsed or parsing failed."""
+        return self._finished
+
+    def _wait_until(self, is_ready, timeout):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: is_ready() or self._finished, timeout)
+            if self.error is not None and not is_ready():
+                raise self.error
+            return is_ready()
+
+    def wait_for_grid(self, timeout=None):
+        """Wait until the title lines are parsed.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            Grid: The grid being filled, or ``None`` after a timeout.
+        """
+        self._wait_until(lambda: self.grid is not None, timeout)
+        return self.grid
+
+    def wait(self, blocks=None, timeout=None):
+        """Wait until a number of blocks is parsed.
+
+        Args:
+            blocks (int): Number of blocks to wait for.
+                By default wait for the whole file.
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            bool: ``True`` if the blocks are parsed, ``False`` after a
+            timeout, after :meth:`stop` or if the file has fewer blocks.
+        """
+        def is_ready():
+            if blocks is None:
+                return self._complete
+            return self.blocks_done >= blocks
+        return self._wait_until(is_ready, timeout)
+
+    def stop(self):
+        """Stop following the file and wait for the parsing thread."""
+        self._stop.set()
+        self._thread.join()
+        if isinstance(self.error, EOFError):
+            self.error = None
@@ -1,56 +1,303 @@
-import pandas as pd
-import chemcoord as cc
 import numpy as np
+import copy
 import re
 import io
+import timeit
 # import line_profiler
 # from line_profiler import LineProfiler
 # from . import _pandas_wrapper
 from . import export
+from ._file_io import open_grid_file, open_output_file
+from .orbital import Orbital
+from .parse_stats import ParseStats
+from . import _electrostatics
+from . import _partition
+from . import _interpolation
+from . import _sharing
+from . import _contraction
+from ._cache import LRUCache
+from . import _tokenize
+from ._formatting import format_values
 
-from scipy.constants import physical_constants
+# pandas, chemcoord and scipy are imported on first use,
+# because they dominate the time of ``import gridparser``.
+
+
+def _bohr_to_a():
+    from scipy.constants import physical_constants
+    return physical_constants['Bohr radius'][0] * 1e10
+
+
+def __getattr__(name):
+    if name == 'BOHR_TO_A':
+        return _bohr_to_a()
+    raise AttributeError(
+        "module '{0}' has no attribute '{1}'".format(__name__, name))
 
-BOHR_TO_A = physical_constants['Bohr radius'][0] * 1e10
 
 def split(string, seperate_newline = True):
+    if isinstance(string, bytes):
+        string = string.decode()
     if seperate_newline:
         return list(filter(None, re.split("[, =]+|(\\n)+", string)))
     else:
         return list(filter(None, re.split("[, =]+", string)))
 
+
+#: Metadata keys in the order of a MOLCAS grid file.
+_METADATA_KEYS = ['VERSION', 'N_of_MO', 'N_of_Grids', 'N_of_Points',
+                  'Block_Size', 'N_Blocks', 'Is_cutoff', 'CutOff', 'N_P',
+                  'N_INDEX', 'Net', 'Origin']
+
+
+def _lattice(metadata):
+    """Return the shape and the basis of the lattice of a grid.
+
+    The grid points are stored in C-order of ``shape``, i.e. the index
+    along ``Axis_3`` runs fastest. The rows of ``basis`` are the
+    lattice vectors in Bohr, so the point with lattice index ``(i, j, k)``
+    sits at ``Origin + (i, j, k) @ basis``.
+    """
+    shape = tuple(int(n) + 1 for n in metadata['Net'])
+    basis = metadata['Axis'].T / np.array(shape)[:, None]
+    return shape, basis
+
+
+def _points(metadata, start, stop):
+    """Return the cartesian coordinates in Bohr of the points
+    ``start`` to ``stop`` in storage order.
+    """
+    shape, basis = _lattice(metadata)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    return np.stack(index, axis=1) @ basis + metadata['Origin']
+
+
+def _region_ranges(metadata, box):
+    """Return the lattice index ranges that cover a cartesian box.
+
+    Args:
+        metadata (dict): Metadata of the grid.
+        box (array-like): ``[[x_min, y_min, z_min], [x_max, y_max, z_max]]``
+            in Angstrom.
+
+    Returns:
+        list: One ``(start, stop)`` tuple per lattice axis.
+    """
+    shape, basis = _lattice(metadata)
+    box = np.asarray(box, dtype='f8')
+    corners = np.array([[box[i, 0], box[j, 1], box[k, 2]]
+                        for i in range(2) for j in range(2) for k in range(2)])
+    fractional = np.linalg.solve(
+        basis.T, (corners / _bohr_to_a() - metadata['Origin']).T).T
+    start = np.clip(np.ceil(fractional.min(axis=0) - 1e-8), 0, shape)
+    stop = np.clip(np.floor(fractional.max(axis=0) + 1e-8) + 1, 0, shape)
+    if (stop <= start).any():
+        raise ValueError('The box does not contain any grid points.')
+    return [(int(a), int(b)) for a, b in zip(start, stop)]
+
+
+def _cropped_metadata(metadata, ranges):
+    """Return the metadata of the grid restricted to ``ranges``."""
+    shape, basis = _lattice(metadata)
+    start = np.array([a for a, _ in ranges])
+    counts = np.array([b - a for a, b in ranges])
+    new = metadata.copy()
+    new['Net'] = counts - 1
+    new['Origin'] = metadata['Origin'] + start @ basis
+    new['Axis'] = (basis * counts[:, None]).T
+    new['N_of_Points'] = new['N_P'] = int(counts.prod())
+    new['N_Blocks'] = -(-new['N_P'] // metadata['Block_Size'])
+    return new
+
+
+def _resampled_metadata(metadata, target):
+    """Return ``metadata`` moved to the lattice of ``target``."""
+    new = metadata.copy()
+    for key in ('Net', 'Origin', 'Axis'):
+        new[key] = np.array(target[key])
+    new['N_of_Points'] = new['N_P'] = int((new['Net'] + 1).prod())
+    new['N_Blocks'] = -(-new['N_P'] // metadata['Block_Size'])
+    return new
+
+
+def _downsampled_metadata(metadata, factor, method):
+    """Return the metadata of the lattice with every ``factor``-th point.
+
+    For ``method='mean'`` the points sit in the centers of the averaged
+    blocks and the points that do not fill a whole block are dropped.
+    """
+    shape, basis = _lattice(metadata)
+    if method == 'mean':
+        counts = np.array(shape) // factor
+    else:
+        counts = -(-np.array(shape) // factor)
+    target = {'Net': counts - 1,
+              'Axis': (basis * (factor * counts)[:, None]).T,
+              'Origin': metadata['Origin']}
+    if method == 'mean':
+        target['Origin'] = metadata['Origin'] + ((factor - 1) / 2.) @ basis
+    return _resampled_metadata(metadata, target)
+
+
+def _is_same_lattice(metadata, other):
+    return all(np.allclose(metadata[key], other[key])
+               for key in ('Net', 'Origin', 'Axis'))
+
+
+def _sublattice(metadata, target):
+    """Return the slices that select the lattice of ``target`` from
+    the lattice of ``metadata``, or None if it is no sub lattice.
+    """
+    shape, basis = _lattice(metadata)
+    target_shape, target_basis = _lattice(target)
+    step = np.linalg.solve(basis.T, target_basis.T).T
+    offset = np.linalg.solve(basis.T, target['Origin'] - metadata['Origin'])
+    integer_step = np.round(step.diagonal()).astype(int)
+    integer_offset = np.round(offset).astype(int)
+    if not (np.allclose(step, np.diag(integer_step), atol=1e-6)
+            and np.allclose(offset, integer_offset, atol=1e-6)
+            and (integer_step > 0).all() and (integer_offset >= 0).all()):
+        return None
+    last = integer_offset + integer_step * (np.array(target_shape) - 1)
+    if (last >= shape).any():
+        return None
+    return tuple(slice(o, l + 1, m) for o, l, m
+                 in zip(integer_offset, last, integer_step))
+
+
+def _box_around(structure, atoms=None, margin=0.):
+    """Return the bounding box of ``atoms`` enlarged by ``margin``."""
+    if atoms is None:
+        atoms = structure.index
+    location = structure.loc[atoms, ['x', 'y', 'z']].values.astype('f8')
+    location = location.reshape(-1, 3)
+    return np.array([location.min(axis=0) - margin,
+                     location.max(axis=0) + margin])
+
 @export
 class Grid():
-    def __init__(self, structure, metadata, orbitals):
+    #: Default budget of :attr:`orbital_cache` in bytes.
+    ORBITAL_CACHE_BYTES = 2 ** 28
+
+    def __init__(self, structure, metadata, orbitals, dtype=None,
+                 orbitals_metadata=None):
         self.structure  = structure
         self.metadata = metadata
+        if orbitals_metadata is None:
+            orbitals_metadata = {}
+        self.orbitals_metadata = orbitals_metadata
+        self.parse_stats = None
+        self._downsampled = {}
+        self._shared = None
+        self.orbital_cache = LRUCache(self.ORBITAL_CACHE_BYTES)
         self._orbital_template = self._give_orbital_template()
+        if dtype is not None:
+            for sym_char in orbitals.keys():
+                for iorb in orbitals[sym_char].keys():
+                    orbitals[sym_char][iorb] = \
+                        orbitals[sym_char][iorb].astype(dtype, copy=False)
         self._orbitals = orbitals
 
     def _give_orbital_template(self):
-        fractional_coord = np.empty([self.metadata['N_of_Points'], 3],
-                                    dtype='f8')
-        i1 = i2 = i3 = 0
-        for row in range(fractional_coord.shape[0]):
-            fractional_coord[row, :3] = [i3, i2, i1]
-            i1 = i1 + 1
-            if i1 > self.metadata['Net'][0]:
-                i1 = 0
-                i2 = i2 + 1
-            if i2 > self.metadata['Net'][1]:
-                i2 = 0
-                i3 = i3 + 1
-
-        basis = self.metadata['Axis'] / (self.metadata['Net'] + 1)
-        increment = (basis[None, :] * fractional_coord[:, None]).sum(axis=1)
-        location = (increment + self.metadata['Origin']) * BOHR_TO_A
-
-        orbital = pd.DataFrame(np.empty([self.metadata['N_of_Points'], 4]),
-                               columns=['x', 'y', 'z', 'value'])
-        orbital.loc[:, 'x' : 'z'] = location
-        return orbital
+        shape, basis = _lattice(self.metadata)
+        bohr_to_a = _bohr_to_a()
+        location = np.empty([self.metadata['N_of_Points'], 3])
+        for axis in range(3):
+            # Broadcasting the three lattice directions against each other
+            # avoids a (N_of_Points, 3) array of lattice indices.
+            increment = sum(
+                (np.arange(n) * basis[i, axis]).reshape(
+                    [-1 if j == i else 1 for j in range(3)])
+                for i, n in enumerate(shape))
+            location[:, axis] = (
+                (increment + self.metadata['Origin'][axis]) * bohr_to_a).ravel()
+        # The location is shared by all orbitals of the grid.
+        location.flags.writeable = False
+        return location
+
+    def share(self, path=None):
+        """Move the arrays of the grid into shared memory.
+
+        Afterwards pickling the grid, e.g. to send it to
+        :mod:`multiprocessing` or :mod:`concurrent.futures` workers,
+        only pickles the metadata and the name of the shared memory.
+        The workers attach to the same memory when unpickling,
+        so fanning out to many workers does not copy the orbitals.
+        Changes of the values in place are seen by all processes.
+
+        Args:
+            path (str): If given, the arrays are stored in a memory
+                mapped file of this name instead of a block of
+                :mod:`multiprocessing.shared_memory`. This also works
+                for processes that are not started by this one.
+
+        Returns:
+            Grid: ``self``, to allow ``grid = Grid.parse_grid(f).share()``.
+        """
+        if self._shared is not None:
+            self.unshare()
+        arrays = {None: self._orbital_template}
+        for sym_char in self._orbitals.keys():
+            for iorb in self._orbitals[sym_char].keys():
+                arrays[sym_char, iorb] = self._orbitals[sym_char][iorb]
+        self._attach(_sharing.SharedArrays.create(arrays, path))
+        return self
+
+    def unshare(self):
+        """Copy the arrays back from shared memory.
+
+        The shared memory is released, if this process created it.
+
+        Returns:
+            Grid: ``self``.
+        """
+        if self._shared is None:
+            return self
+        for sym_char in self._orbitals.keys():
+            for iorb in self._orbitals[sym_char].keys():
+                self._orbitals[sym_char][iorb] = \
+                    self._orbitals[sym_char][iorb].copy()
+        self._orbital_template = self._orbital_template.copy()
+        self._orbital_template.flags.writeable = False
+        self.orbital_cache.invalidate()
+        self._shared.release()
+        self._shared = None
+        return self
+
+    def _attach(self, shared):
+        self.orbital_cache.invalidate()
+        arrays = dict(shared.arrays)
+        self._orbital_template = arrays.pop(None)
+        self._orbital_template.flags.writeable = False
+        self._orbitals = {}
+        for (sym_char, iorb), values in sorted(arrays.items()):
+            self._orbitals.setdefault(sym_char, {})[iorb] = values
+        self._shared = shared
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Derived arrays are rebuilt instead of pickled.
+        state['_downsampled'] = {}
+        state['orbital_cache'] = LRUCache(self.orbital_cache.max_bytes)
+        if (self.parse_stats is not None
+                and self.parse_stats.preview is not None):
+            # The preview is available again from downsample.
+            state['parse_stats'] = copy.copy(self.parse_stats)
+            state['parse_stats'].preview = None
+        del state['_orbital_template']
+        if self._shared is not None:
+            del state['_orbitals']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._shared is not None:
+            self._attach(self._shared)
+        else:
+            self._orbital_template = self._give_orbital_template()
 
     def __repr__(self):
-        treat_density = 0 in self._orbitals[1]
+        treat_density = 0 in self._orbitals.get(1, {})
         string_list = ['1 Electronic density\n'] if treat_density else []
         for symm_char in self._orbitals.keys():
             N_orb = len(self._orbitals[symm_char])
@@ -60,44 +307,675 @@ class Grid():
             string_list.append(text)
         return ''.join(string_list)
 
+    def _combine(self, other, operation, inplace=False):
+        if not isinstance(other, Grid):
+            return NotImplemented
+        if not _is_same_lattice(self.metadata, other.metadata):
+            other = other.resample(self.metadata)
+        orbitals = {}
+        for sym_char in self._orbitals.keys():
+            for iorb in self._orbitals[sym_char].keys():
+                try:
+                    values = other._orbitals[sym_char][iorb]
+                except KeyError:
+                    continue
+                if inplace:
+                    operation(self._orbitals[sym_char][iorb], values,
+                              out=self._orbitals[sym_char][iorb])
+                    self.orbital_cache.invalidate((sym_char, iorb))
+                    continue
+                orbitals.setdefault(sym_char, {})[iorb] = operation(
+                    self._orbitals[sym_char][iorb], values)
+        if inplace:
+            self._downsampled = {}
+            return self
+        return self.__class__(self.structure, self.metadata, orbitals,
+                              orbitals_metadata=self.orbitals_metadata)
+
     def __add__(self, other):
-        pass
+        """Add the orbitals that are in both grids.
+
+        If the lattices differ, ``other`` is resampled onto the lattice
+        of ``self`` first, see :meth:`resample`.
+        """
+        return self._combine(other, np.add)
 
     def __radd__(self, other):
-        pass
+        # Allows to use sum() on a list of grids.
+        if other == 0:
+            return self
+        return self._combine(other, np.add)
+
+    def __sub__(self, other):
+        """Subtract the orbitals that are in both grids.
+
+        If the lattices differ, ``other`` is resampled onto the lattice
+        of ``self`` first, see :meth:`resample`. This gives e.g.
+        difference densities of different points of a scan.
+        """
+        return self._combine(other, np.subtract)
+
+    def __iadd__(self, other):
+        """Add the orbitals that are in both grids in place.
+
+        Cached orbitals of :meth:`give_orbital` are invalidated.
+        """
+        return self._combine(other, np.add, inplace=True)
+
+    def __isub__(self, other):
+        """Subtract the orbitals that are in both grids in place.
+
+        Cached orbitals of :meth:`give_orbital` are invalidated.
+        """
+        return self._combine(other, np.subtract, inplace=True)
 
     def __rmatmul__(self, other):
         pass
 
+    def crop(self, box=None, atoms=None, margin=0.):
+        """Restrict the grid to a cartesian box.
+
+        The kept points are the lattice index ranges that cover the box,
+        so for a non orthogonal lattice a few points outside the box
+        are kept as well.
+
+        Args:
+            box (array-like): ``[[x_min, y_min, z_min],
+                [x_max, y_max, z_max]]`` in Angstrom.
+                If it is not given, the bounding box of ``atoms``
+                is used.
+            atoms (list): Indices of atoms in :attr:`structure`.
+                By default all atoms.
+            margin (float): Distance in Angstrom by which the bounding box
+                of ``atoms`` is enlarged.
+
+        Returns:
+            Grid: A new grid with updated ``Origin``, ``Net``
+            and ``Axis``.
+        """
+        if box is None:
+            box = _box_around(self.structure, atoms, margin)
+        ranges = _region_ranges(self.metadata, box)
+        shape, _ = _lattice(self.metadata)
+        selection = tuple(slice(a, b) for a, b in ranges)
+        orbitals = {}
+        for sym_char in self._orbitals.keys():
+            orbitals[sym_char] = {}
+            for iorb, values in self._orbitals[sym_char].items():
+                orbitals[sym_char][iorb] = \
+                    values.reshape(shape)[selection].ravel()
+        return self.__class__(
+            self.structure, _cropped_metadata(self.metadata, ranges), orbitals,
+            orbitals_metadata=self.orbitals_metadata)
+
+    def downsample(self, factor, method='mean'):
+        """Return a coarser grid.
+
+        The result is cached, so repeated calls are cheap.
+
+        Args:
+            factor (int or tuple): Reduction of the number of points along
+                each axis.
+            method (str): ``'mean'`` averages blocks of ``factor`` points
+                along each axis, ``'decimate'`` keeps every ``factor``-th
+                point. If ``Net + 1`` is not divisible by ``factor``,
+                ``'mean'`` drops the last points that do not fill a
+                whole block, so the coarse lattice stays regular.
+
+        Returns:
+            Grid: Grid with ``Net + 1`` divided by ``factor``, rounded
+            down for ``'mean'`` and up for ``'decimate'``, and ``Axis``
+            and ``Origin`` adjusted.
+        """
+        factor = np.broadcast_to(np.asarray(factor, dtype=int), (3,))
+        key = (tuple(int(n) for n in factor), method)
+        if key in self._downsampled:
+            return self._downsampled[key]
+        if method not in ('mean', 'decimate'):
+            raise ValueError("method has to be 'mean' or 'decimate'.")
+        shape, _ = _lattice(self.metadata)
+        if method == 'mean' and (np.array(shape) < factor).any():
+            raise ValueError('factor is larger than the number of points.')
+        metadata = _downsampled_metadata(self.metadata, factor, method)
+        counts, _ = _lattice(metadata)
+        coarse = {}
+        for sym_char in self._orbitals.keys():
+            coarse[sym_char] = {}
+            for iorb, values in self._orbitals[sym_char].items():
+                values = values.reshape(shape)
+                if method == 'decimate':
+                    new = values[::factor[0], ::factor[1], ::factor[2]]
+                else:
+                    blocks = values[:counts[0] * factor[0],
+                                    :counts[1] * factor[1],
+                                    :counts[2] * factor[2]].reshape(
+                        counts[0], factor[0], counts[1], factor[1],
+                        counts[2], factor[2])
+                    new = blocks.mean(axis=(1, 3, 5), dtype='f8').astype(
+                        values.dtype)
+                coarse[sym_char][iorb] = new.ravel()
+        grid = self.__class__(self.structure, metadata, coarse,
+                              orbitals_metadata=self.orbitals_metadata)
+        self._downsampled[key] = grid
+        return grid
+
+    def pyramid(self, levels=3, method='mean'):
+        """Return grids with successively halved resolution.
+
+        Every level is downsampled from the previous one and cached.
+
+        Args:
+            levels (int): Number of levels including the grid itself.
+            method (str): See :meth:`downsample`.
+
+        Returns:
+            list: ``[self, self.downsample(2), ...]``
+        """
+        pyramid = [self]
+        for _ in range(levels - 1):
+            pyramid.append(pyramid[-1].downsample(2, method=method))
+        return pyramid
+
+    def resample(self, target, orbitals=None, fill_value=0.,
+                 chunk_size=2 ** 18):
+        """Interpolate the grid onto another regular lattice.
+
+        If the target lattice is a sub lattice of the grid, i.e. it is
+        shifted by an integer number of points and its lattice vectors
+        are integer multiples, the values are selected without
+        interpolation. Otherwise they are interpolated trilinearly,
+        processing ``chunk_size`` target points at once.
+
+        Args:
+            target (dict or Grid): Metadata with the keys ``Net``,
+                ``Origin`` and ``Axis``, or a grid whose lattice is used.
+            orbitals (list): List of ``(symmetry_char, iorb)`` tuples.
+                By default all orbitals are resampled.
+            fill_value (float): Value of points outside of the grid.
+            chunk_size (int): Number of target points per chunk.
+
+        Returns:
+            Grid: A new grid on the target lattice.
+        """
+        if isinstance(target, Grid):
+            target = target.metadata
+        metadata = _resampled_metadata(self.metadata, target)
+        if orbitals is None:
+            orbitals = [(sym_char, iorb) for sym_char in self._orbitals.keys()
+                        for iorb in self._orbitals[sym_char].keys()]
+        shape, basis = _lattice(self.metadata)
+        selection = _sublattice(self.metadata, metadata)
+        N_of_Points = metadata['N_of_Points']
+
+        resampled = {}
+        for sym_char, iorb in orbitals:
+            values = self._orbitals[sym_char][iorb].reshape(shape)
+            if selection is not None:
+                new = values[selection].ravel()
+            else:
+                new = np.empty(N_of_Points, dtype=values.dtype)
+                for start in range(0, N_of_Points, chunk_size):
+                    stop = min(start + chunk_size, N_of_Points)
+                    fractional = np.linalg.solve(
+                        basis.T, (_points(metadata, start, stop)
+                                  - self.metadata['Origin']).T).T
+                    new[start:stop] = _interpolation.trilinear(
+                        values, fractional, fill_value)
+            resampled.setdefault(sym_char, {})[iorb] = new
+        return self.__class__(self.structure, metadata, resampled,
+                              orbitals_metadata=self.orbitals_metadata)
+
+    def _give_values(self, orbitals):
+        """Return the arrays of ``orbitals`` and whether it is a list.
+
+        ``None`` stands for the electronic density.
+        """
+        if orbitals is None:
+            return [self._give_density(None)], False
+        return [self._orbitals[sym_char][iorb]
+                for sym_char, iorb in orbitals], True
+
+    def project(self, axis, orbitals=None, average=False,
+                chunk_size=2 ** 18):
+        """Integrate out lattice axes.
+
+        Integrating out one axis gives a projection onto the plane of
+        the other two, integrating out two axes a profile along the
+        remaining one, e.g. the planar integrated density of a slab.
+        The values are divided by the length or area that the remaining
+        lattice vectors span, so non orthogonal cells are handled
+        correctly and the result is in atomic units.
+        The arrays are reduced in chunks of planes along the first
+        (slowest) lattice index, so memory mapped or shared grids are
+        not copied.
+
+        Args:
+            axis (int or tuple): Lattice axis or axes to integrate out.
+            orbitals (list): List of ``(symmetry_char, iorb)`` tuples.
+                By default the electronic density is projected.
+            average (bool): Return the mean over the axes instead of
+                the integral, e.g. the planar averaged density.
+            chunk_size (int): Approximate number of points per chunk.
+
+        Returns:
+            numpy.ndarray: The remaining lattice axes, with an additional
+            first axis over ``orbitals`` if they are given.
+        """
+        axes = tuple(sorted(set(
+            i % 3 for i in ((axis,) if np.isscalar(axis) else axis))))
+        shape, basis = _lattice(self.metadata)
+        kept = [i for i in range(3) if i not in axes]
+        if average:
+            factor = 1. / np.prod([shape[i] for i in axes])
+        else:
+            remaining = basis[kept]
+            measure = (np.sqrt(np.linalg.det(remaining @ remaining.T))
+                       if kept else 1.)
+            factor = abs(np.linalg.det(basis)) / measure
+        values, is_list = self._give_values(orbitals)
+
+        result = np.zeros([len(values)] + [shape[i] for i in kept])
+        plane = shape[1] * shape[2]
+        rows = max(1, chunk_size // plane)
+        for start in range(0, shape[0], rows):
+            stop = min(start + rows, shape[0])
+            for k, array in enumerate(values):
+                reduced = array[start * plane:stop * plane].reshape(
+                    stop - start, shape[1], shape[2]).sum(axis=axes, dtype='f8')
+                if 0 in axes:
+                    result[k] += reduced
+                else:
+                    result[k, start:stop] += reduced
+        result *= factor
+        return result if is_list else result[0]
+
+    def line_profile(self, a, b, n=100, orbitals=None, fill_value=0.):
+        """Interpolate values along a straight line.
+
+        The values are interpolated trilinearly, which only reads the
+        lattice points around the line.
+
+        Args:
+            a (array-like): Start of the line in Angstrom.
+            b (array-like): End of the line in Angstrom.
+            n (int): Number of points on the line, including both ends.
+            orbitals (list): List of ``(symmetry_char, iorb)`` tuples.
+                By default the profile of the electronic density.
+            fill_value (float): Value of points outside of the grid.
+
+        Returns:
+            tuple: The distance from ``a`` in Angstrom with shape
+            ``(n,)`` and the values with shape ``(n,)``, or
+            ``(len(orbitals), n)`` if ``orbitals`` are given.
+        """
+        a, b = np.asarray(a, dtype='f8'), np.asarray(b, dtype='f8')
+        t = np.linspace(0., 1., n)
+        points = (a + t[:, None] * (b - a)) / _bohr_to_a()
+        shape, basis = _lattice(self.metadata)
+        fractional = np.linalg.solve(
+            basis.T, (points - self.metadata['Origin']).T).T
+        values, is_list = self._give_values(orbitals)
+        profiles = np.array([
+            _interpolation.trilinear(array.reshape(shape), fractional,
+                                     fill_value)
+            for array in values])
+        distance = t * np.linalg.norm(b - a)
+        return distance, profiles if is_list else profiles[0]
+
+    def _give_density(self, density):
+        """Return the values of ``density`` as it is accepted by
+        :meth:`hartree_potential`.
+        """
+        if density is None:
+            try:
+                return self._orbitals[1][0]
+            except KeyError:
+                raise ValueError('The grid contains no electronic density.')
+        if isinstance(density, tuple):
+            return self._orbitals[density[0]][density[1]] ** 2
+        density = np.asarray(density)
+        if density.shape != (self.metadata['N_of_Points'],):
+            raise ValueError('The density has to have one value per point.')
+        return density
+
+    def density_from_matrix(self, density_matrix, orbitals=None,
+                            chunk_size=2**16):
+        """Contract a density matrix with the orbitals of the grid.
+
+        Computes :math:`\\rho(r) = \\sum_{ij} D_{ij} \\phi_i(r) \\phi_j(r)`,
+        e.g. correlated or transition densities. The points are
+        processed in chunks with one matrix product per chunk, so the
+        cost is linear in the number of points and runs in BLAS.
+        A matrix with a single nonzero entry gives the product of two
+        orbitals.
+
+        Args:
+            density_matrix: Either a matrix over the ``orbitals``, or a
+                dictionary that maps symmetry characters to the blocks
+                of a symmetry blocked density matrix. The rows of a block
+                belong to the orbitals of that symmetry in ascending
+                order, the density ``orbitals[1][0]`` excluded.
+            orbitals (list): ``(symmetry_char, iorb)`` tuples of the rows
+                of a density matrix that is not blocked. By default all
+                orbitals of the grid in ascending order.
+            chunk_size (int): Number of points per chunk.
+
+        Returns:
+            numpy.ndarray: One value per point, with the same layout
+            as the orbital arrays.
+        """
+        def in_symmetry(sym_char):
+            return [(sym_char, iorb)
+                    for iorb in sorted(self._orbitals[sym_char])
+                    if (sym_char, iorb) != (1, 0)]
+
+        if isinstance(density_matrix, dict):
+            blocks = [(in_symmetry(sym_char), matrix)
+                      for sym_char, matrix in density_matrix.items()]
+        else:
+            if orbitals is None:
+                orbitals = [key for sym_char in sorted(self._orbitals)
+                            for key in in_symmetry(sym_char)]
+            blocks = [(orbitals, density_matrix)]
+        result = np.zeros(self.metadata['N_of_Points'])
+        for keys, matrix in blocks:
+            try:
+                values = [self._orbitals[sym_char][iorb]
+                          for sym_char, iorb in keys]
+            except KeyError:
+                raise ValueError(
+                    'Not all orbitals of {0} are in the grid.'.format(keys))
+            _contraction.contract(values, matrix, chunk_size, out=result)
+        return result
+
+    def hartree_potential(self, density=None):
+        """Electrostatic potential of a charge density on the grid.
+
+        The Poisson equation is solved for an isolated system by FFT
+        convolution with ``1 / r`` on a lattice zero padded to twice its
+        size. The lattice vectors are used as they are, so non orthogonal
+        cells are handled correctly.
+        The density is taken to be in electrons per Bohr\ :sup:`3`,
+        i.e. positive, and the potential it creates is returned in
+        Hartree per electron (atomic units).
+
+        Args:
+            density: Either ``None`` for the electronic density
+                ``orbitals[1][0]``, a tuple ``(symmetry_char, iorb)`` for
+                the density of an orbital, or an array with one value per
+                point.
+
+        Returns:
+            numpy.ndarray: The potential with the same layout
+            as the orbital arrays.
+        """
+        shape, basis = _lattice(self.metadata)
+        density = self._give_density(density).astype('f8', copy=False)
+        return _electrostatics.hartree_potential(density, shape, basis)
+
+    def atomic_populations(self, density=None, method='voronoi',
+                           chunk_size=None):
+        """Integrate densities over the atoms of :attr:`structure`.
+
+        Every point is assigned to atoms either by a Voronoi partition,
+        i.e. to the nearest atom with a KD-tree, or by smooth Becke
+        weights. The points are processed in chunks, so neither the
+        coordinates of all points nor a point times atom matrix are
+        kept in memory.
+
+        Args:
+            density: The density as accepted by :meth:`hartree_potential`
+                or a list of those to integrate several densities in
+                one pass.
+            method (str): ``'voronoi'`` or ``'becke'``.
+            chunk_size (int): Number of points per chunk. By default it is
+                chosen such that the Becke weights need about 100 MB.
+
+        Returns:
+            pandas.Series: Number of electrons per atom, indexed like
+            :attr:`structure`. For a list of densities a
+            :class:`pandas.DataFrame` with one column per density.
+        """
+        import pandas as pd
+        is_list = isinstance(density, list)
+        densities = [self._give_density(d)
+                     for d in (density if is_list else [density])]
+        atoms = self.structure.loc[:, ['x', 'y', 'z']].values.astype('f8')
+        atoms = atoms / _bohr_to_a()
+        if chunk_size is None:
+            chunk_size = max(2 ** 10, 2 ** 22 // len(atoms) ** 2)
+        N_of_Points = self.metadata['N_of_Points']
+
+        def chunks():
+            for start in range(0, N_of_Points, chunk_size):
+                stop = min(start + chunk_size, N_of_Points)
+                yield (_points(self.metadata, start, stop),
+                       np.stack([d[start:stop] for d in densities]))
+
+        _, basis = _lattice(self.metadata)
+        result = _partition.populations(
+            chunks(), atoms, abs(np.linalg.det(basis)), method=method)
+        if is_list:
+            return pd.DataFrame(result.T, index=self.structure.index)
+        return pd.Series(result[0], index=self.structure.index)
+
     def give_orbital(self, symmetry_char, iorb):
-        orbital = self._orbital_template.copy()
-        orbital['value'] = self._orbitals[symmetry_char][iorb]
+        """Return an orbital of the grid.
+
+        Every call returns a new orbital, but the read-only data of its
+        :attr:`Orbital.frame` is kept in :attr:`orbital_cache`, so it is
+        built only once. Modifying the orbital copies the data first, so
+        neither the grid nor the cache change. :attr:`Orbital.values`
+        and :attr:`Orbital.location` are read-only views of the grid.
+        Each entry is charged with the size of the frame against the
+        budget ``orbital_cache.max_bytes``, and the least recently used
+        frames are evicted. While the grid is still parsed, e.g. in a
+        ``progress`` callback, nothing is cached and the frame is built
+        on first access. In place arithmetic of the grid
+        invalidates the cache; after modifying the arrays otherwise call
+        ``orbital_cache.invalidate()``.
+
+        Args:
+            symmetry_char (int): Symmetry character as defined by MOLCAS.
+            iorb (int): Number of the orbital within the symmetry.
+                ``give_orbital(1, 0)`` returns the density.
+
+        Returns:
+            Orbital: The orbital with its energy, occupation and status.
+        """
+        key = (symmetry_char, iorb)
+        values = self._orbitals[symmetry_char][iorb].view()
+        values.flags.writeable = False
+        orbital_metadata = self.orbitals_metadata.get(
+            symmetry_char, {}).get(iorb, {})
+        orbital = Orbital(location=self._orbital_template, values=values,
+                          grid_metadata=self.metadata, **orbital_metadata)
+        if self.parse_stats is not None and self.parse_stats.grid is self:
+            # The arrays of a grid that is still parsed change, see
+            # ParseStats.grid, so its frames must not be cached.
+            return orbital
+        frame = self.orbital_cache.get(key)
+        if frame is None:
+            frame = orbital._read_only_frame()
+            self.orbital_cache.put(key, frame, frame.values.nbytes)
+        orbital._share_frame(frame)
         return orbital
-        # return orbital, energy
 
-    @classmethod
-    def parse_grid(cls, file):
-        """Parse an ASCII formatted MOLCAS grid file.
+    def _give_grid_titles(self):
+        """Return the ``GridName`` titles of all grids, the density first."""
+        titles = []
+        for sym_char in sorted(self._orbitals.keys()):
+            for iorb in sorted(self._orbitals[sym_char].keys()):
+                if (sym_char, iorb) == (1, 0):
+                    titles.insert(0, ((1, 0), 'Density'))
+                    continue
+                orbital_metadata = self.orbitals_metadata.get(
+                    sym_char, {}).get(iorb, {})
+                titles.append(((sym_char, iorb), '{0} {1} {2!r} ({3!r}) {4}'.format(
+                    sym_char, iorb,
+                    float(orbital_metadata.get('energy', np.nan)),
+                    float(orbital_metadata.get('occupation', np.nan)),
+                    str(orbital_metadata.get('status', '?')).replace(' ', '_'))))
+        return titles
+
+    def write_grid(self, path, precision=10):
+        """Write the grid as ASCII MOLCAS grid file.
+
+        The file can be read again with :meth:`parse_grid`.
+        ``N_of_Grids``, ``N_of_Points``, ``N_P`` and ``N_Blocks`` are
+        taken from the grid, so cropped, resampled or combined grids
+        give consistent files. The values of every block are
+        formatted at once with vectorized integer arithmetic.
 
         Args:
-            file (str): Filename, or path to file.
+            path (str): Output file. If it ends with ``.gz``, ``.xz`` or
+                ``.bz2`` the file is compressed.
+            precision (int): Number of digits after the decimal point,
+                between 1 and 17. With 16 the values are read back
+                without loss.
 
         Returns:
-            dict: Dictionary with 4 keys:
+            None:
+        """
+        titles = self._give_grid_titles()
+        metadata = self.metadata.copy()
+        N_of_Points = metadata['N_of_Points']
+        block_size = metadata['Block_Size']
+        metadata['N_of_Grids'] = len(titles)
+        metadata['N_P'] = N_of_Points
+        metadata['N_Blocks'] = -(-N_of_Points // block_size)
+        metadata['Is_cutoff'] = int(metadata.get('Is_cutoff', 0))
 
-                **metadata**: Metadata of the grid.
+        def give_value(value):
+            if isinstance(value, (list, np.ndarray)):
+                return ' '.join(repr(v) if isinstance(v, float) else str(v)
+                                for v in np.asarray(value).tolist())
+            return repr(value) if isinstance(value, float) else str(value)
+
+        lines = ['9999902010 {0}'.format(N_of_Points),
+                 '# Written by gridparser',
+                 'Natom= {0}'.format(len(self.structure))]
+        atoms = self.structure.loc[:, ['atom', 'x', 'y', 'z']].values
+        for i, (atom, x, y, z) in enumerate(atoms):
+            lines.append('{0}{1} {2!r} {3!r} {4!r}'.format(
+                atom, i + 1, float(x), float(y), float(z)))
+        for key in _METADATA_KEYS:
+            if key in metadata:
+                lines.append('{0}= {1}'.format(key, give_value(metadata[key])))
+        for i in range(3):
+            lines.append('Axis_{0}= {1}'.format(
+                i + 1, give_value(metadata['Axis'][:, i])))
+        for _, title in titles:
+            lines.append('GridName= {0}'.format(title))
 
-                **orbitals**: Nested dictionary::
+        with open_output_file(path) as f:
+            f.write(('\n'.join(lines) + '\n').encode())
+            for start in range(0, N_of_Points, block_size):
+                stop = min(start + block_size, N_of_Points)
+                for (sym_char, iorb), title in titles:
+                    f.write('Title= {0}\n'.format(title).encode())
+                    f.write(format_values(
+                        self._orbitals[sym_char][iorb][start:stop],
+                        precision=precision))
+
+    def write_cube(self, path, symmetry_char=1, iorb=0, chunk_size=2**18):
+        """Write one orbital or the density as Gaussian cube file.
+
+        Args:
+            path (str): Output file. If it ends with ``.gz``, ``.xz`` or
+                ``.bz2`` the file is compressed.
+            symmetry_char (int): Symmetry character of the orbital.
+            iorb (int): Number of the orbital. ``(1, 0)`` is the density.
+            chunk_size (int): Approximate number of values that are
+                formatted at once.
+
+        Returns:
+            None:
+        """
+        values = self._orbitals[symmetry_char][iorb]
+        shape, basis = _lattice(self.metadata)
+        bohr_to_a = _bohr_to_a()
+        structure = self.structure.add_data('atomic_number')
+        lines = ['Written by gridparser',
+                 'Orbital {0} {1}'.format(symmetry_char, iorb),
+                 '{0:5d}{1:12.6f}{2:12.6f}{3:12.6f}'.format(
+                     len(structure), *self.metadata['Origin'])]
+        for n, vector in zip(shape, basis):
+            lines.append('{0:5d}{1:12.6f}{2:12.6f}{3:12.6f}'.format(n, *vector))
+        atomic_numbers = structure.loc[:, 'atomic_number'].values
+        coordinates = structure.loc[:, ['x', 'y', 'z']].values / bohr_to_a
+        for Z, (x, y, z) in zip(atomic_numbers, coordinates):
+            lines.append('{0:5d}{1:12.6f}{2:12.6f}{3:12.6f}{4:12.6f}'.format(
+                int(Z), float(Z), x, y, z))
+
+        # Six values per line and a new line for every row along the
+        # last axis. The newlines of format_values are dropped otherwise.
+        n_z = shape[2]
+        rows = max(1, chunk_size // n_z) * n_z
+        k = np.arange(rows) % n_z
+        is_joined = (k % 6 != 5) & (k != n_z - 1)
+        with open_output_file(path) as f:
+            f.write(('\n'.join(lines) + '\n').encode())
+            for start in range(0, len(values), rows):
+                chunk = values[start:start + rows]
+                formatted = np.frombuffer(
+                    format_values(chunk, precision=5), dtype='u1').reshape(
+                        len(chunk), -1)
+                is_kept = np.ones(formatted.shape, dtype=bool)
+                is_kept[:, -1] = ~is_joined[:len(chunk)]
+                f.write(formatted[is_kept].tobytes())
+
+    @classmethod
+    def parse_grid(cls, file, dtype='f8', orbitals=None, include_density=True,
+                   region=None, region_atoms=None, region_margin=0.,
+                   progress=None, preview=None, tokenizer='auto'):
+        """Parse an ASCII formatted MOLCAS grid file.
+
+        Args:
+            file (str or file-like): Filename, path to file or an opened
+                file object. Files compressed with gzip, xz, bz2 or zstd
+                are decompressed on the fly.
+            dtype (str or numpy.dtype): Floating point type of the parsed
+                orbital values. Use ``'f4'`` to halve the memory
+                footprint of large grids.
+            orbitals (list): List of ``(symmetry_charakter, n-th)`` tuples.
+                If given, only these orbitals are parsed and the lines of
+                all other orbitals are skipped without conversion.
+                By default all orbitals are parsed. ``(1, 0)`` selects
+                the density, also if ``include_density`` is False.
+            include_density (bool): Parse the electronic density.
+            region (array-like): Cartesian box
+                ``[[x_min, y_min, z_min], [x_max, y_max, z_max]]``
+                in Angstrom. If given, only the points within the box
+                are kept (see :meth:`crop`) and the lines of all other
+                points are skipped without conversion.
+            region_atoms (list): Use the bounding box of these atoms
+                as region.
+            region_margin (float): Distance in Angstrom by which the
+                bounding box of ``region_atoms`` is enlarged.
+            progress (callable): Called with the :class:`ParseStats`
+                once the title lines are read and after every block.
+                The statistics of the finished parse
+                are stored in ``grid.parse_stats``.
+            preview (int): If given, a grid with every ``preview``-th
+                point along each axis is filled while the blocks are read.
+                It is available as ``stats.preview`` in the ``progress``
+                callback, with NaN for points not read yet, and afterwards
+                as ``grid.downsample(preview, method='decimate')``.
+            tokenizer (str): ``'numba'`` parses the bytes of the blocks
+                with compiled kernels, without a Python string per line.
+                The values are rounded exactly like ``float`` and the
+                same lines are accepted as by ``'numpy'``; the few lines
+                that the kernels can not parse or round correctly are
+                converted by ``float``. ``'numpy'`` converts the lines with numpy.
+                ``'auto'`` uses numba if it is installed and at least a
+                million values are converted, because compilation takes
+                about a second.
 
-                    orbitals[symmetry_charakter][n-th]
+        Returns:
+            Grid: The parsed grid with the attributes:
 
-                returns the n-th orbital within a given symmetry_charakter.
-                The symmetry_charakter is an integer as defined by MOLCAS
-                depending on the used symmetry group in the grid file.
-                Read more in the MOLCAS manual.
-                ``orbitals[1][0]`` is a special case that returns the overall
-                density. (Note that the density is totally symmetric so this
-                assignment is even physical).
+                **metadata**: Metadata of the grid.
 
                 **orbitals_metadata**: Nested dictionary::
 
@@ -106,22 +984,76 @@ class Grid():
                 returns a dictionary for the n-th orbital within a given
                 symmetry_charakter with the entries ``energy, occupation, status``.
 
-                **molecule**: A chemcoord instance containing information about the
-                coordinates of the molecule.
+                **structure**: A chemcoord instance containing information
+                about the coordinates of the molecule.
+
+                **parse_stats**: :class:`ParseStats` of the parse.
+
+            The orbitals are returned by ``give_orbital(symmetry_charakter,
+            n-th)``. The symmetry_charakter is an integer as defined by
+            MOLCAS depending on the used symmetry group in the grid file.
+            Read more in the MOLCAS manual.
+            ``give_orbital(1, 0)`` is a special case that returns the overall
+            density. (Note that the density is totally symmetric so this
+            assignment is even physical).
+        """
+        with open_grid_file(file) as f:
+            return cls._parse_grid(f, dtype, orbitals, include_density,
+                                   region, region_atoms, region_margin,
+                                   progress, preview, tokenizer=tokenizer)
+
+    @classmethod
+    def parse_header(cls, file):
+        """Parse only the header and the title lines of a grid file.
+
+        This is cheap even for huge files, because none of the blocks
+        are read.
+
+        Args:
+            file (str or file-like): See :meth:`parse_grid`.
+
+        Returns:
+            dict: Dictionary with the keys **metadata**,
+            **orbitals_metadata** and **molecule**. They are described
+            in :meth:`parse_grid`, where the molecule is the attribute
+            **structure**.
         """
+        with open_grid_file(file) as f:
+            molecule, metadata, orbitals_metadata = cls._parse_grid(
+                f, dtype='f8', orbitals=None, include_density=True,
+                region=None, region_atoms=None, region_margin=0.,
+                progress=None, preview=None, header_only=True)
+        return {'metadata': metadata, 'orbitals_metadata': orbitals_metadata,
+                'molecule': molecule}
+
+    @classmethod
+    def _parse_grid(cls, f, dtype, orbitals, include_density,
+                    region, region_atoms, region_margin, progress, preview,
+                    header_only=False, tokenizer='numpy'):
         metadata = {}
         orbitals_metadata = {}
-        orbitals = {}
+        orbital_values = {}
+        if orbitals is not None:
+            orbitals = set(tuple(key) for key in orbitals)
+        stats = ParseStats()
+        timer = timeit.default_timer
 
-        f = open(file, 'tr')
+        def readline():
+            line = f.readline()
+            stats.bytes_read += len(line)
+            return line
+
+        start = timer()
         for _ in range(2):
-            f.readline()
-        line = split(f.readline())
+            readline()
+        line = split(readline())
         metadata['Natom'] = int(line[1])
+        stats.timings['header'] += timer() - start
 
+        start = timer()
         molecule_in = []
         for _ in range(metadata['Natom']):
-            line = split(f.readline())
+            line = split(readline())
             # The following removes numbers after element symbol
             element_symbol = re.search("[a-zA-Z]", line[0]).group()
             line[0] = element_symbol
@@ -130,8 +1062,10 @@ class Grid():
         molecule_in = ' '.join(molecule_in)
         molecule_in = str(metadata['Natom']) + (2 * '\n') + molecule_in
         molecule_in = io.StringIO(molecule_in)
+        import chemcoord as cc
 #          molecule = cc.read(molecule_in, filetype='xyz')
         molecule = cc.Cartesian.read_xyz(molecule_in)
+        stats.timings['molecule'] += timer() - start
 
         def get_value_and_correct_type(line):
             def get_string(line):
@@ -139,7 +1073,7 @@ class Grid():
             def get_integer(line):
                 return int(line[1])
             def get_boolean(line):
-                return bool(line[1])
+                return bool(int(line[1]))
             def get_floating(line):
                 return float(line[1])
             def get_int_array(line):
@@ -169,25 +1103,32 @@ class Grid():
             actions['GridName'] = get_string
             return actions[line[0]](line)
 
-        end_of_metadata_reached = False
-        while not end_of_metadata_reached:
-            line = split(f.readline())
-            if line[0] == 'GridName':
-                end_of_metadata_reached = True
-            else:
-                current_line = f.tell()
-                key = line[0]
-                metadata[key] = get_value_and_correct_type(line)
+        start = timer()
+        # The first title line ends the metadata. It is kept in ``line``
+        # instead of seeking back, so non seekable streams work as well.
+        line = split(readline())
+        while line[0] != 'GridName':
+            metadata[line[0]] = get_value_and_correct_type(line)
+            line = split(readline())
         metadata['Axis'] = np.array([metadata[axis] for axis in ('Axis_1', 'Axis_2', 'Axis_3')]).T
         for axis in ('Axis_1', 'Axis_2', 'Axis_3'):
             del metadata[axis]
 
-        f.seek(current_line, 0)
-
+        if region is None and region_atoms is not None:
+            region = _box_around(molecule, region_atoms, region_margin)
+        if region is None:
+            grid_metadata = metadata
+        else:
+            shape, _ = _lattice(metadata)
+            ranges = _region_ranges(metadata, region)
+            grid_metadata = _cropped_metadata(metadata, ranges)
+        stats.timings['header'] += timer() - start
 
+        start = timer()
         order_of_orbitals = []
-        for _ in range(metadata['N_of_Grids']):
-            line = split(f.readline())
+        for ig in range(metadata['N_of_Grids']):
+            if ig > 0:
+                line = split(readline())
             try:
                 symmetry_charakter = int(line[1])
                 number_of_order = int(line[2])
@@ -198,13 +1139,23 @@ class Grid():
                 symmetry_charakter = 1
                 number_of_order = 0
 
-            order_of_orbitals.append((symmetry_charakter, number_of_order))
+            key = (symmetry_charakter, number_of_order)
+            if number_of_order == 0:
+                is_wanted = include_density or (
+                    orbitals is not None and key in orbitals)
+            else:
+                is_wanted = orbitals is None or key in orbitals
+            if not is_wanted:
+                order_of_orbitals.append(None)
+                continue
+            order_of_orbitals.append(key)
 
-            value = np.full(metadata['N_of_Points'], '0', dtype='a30')
+            value = np.empty(0 if header_only else grid_metadata['N_of_Points'],
+                             dtype=dtype)
             try:
-                orbitals[symmetry_charakter][number_of_order] = value
+                orbital_values[symmetry_charakter][number_of_order] = value
             except KeyError:
-                orbitals[symmetry_charakter] = {number_of_order : value}
+                orbital_values[symmetry_charakter] = {number_of_order : value}
 
             try:
                 orbitals_metadata[symmetry_charakter][number_of_order] = {}
@@ -224,30 +1175,130 @@ class Grid():
                     # # parentheses
                     current['occupation'] = float(re.sub('[\(\)]', '', line[4]))
                     current['status'] = line[5]
+        stats.timings['titles'] += timer() - start
 
-
+        if orbitals is not None:
+            missing = orbitals - set(key for key in order_of_orbitals if key)
+            if missing:
+                raise ValueError(
+                    'The orbitals {0} are not in the grid file.'.format(
+                        sorted(missing)))
+        if header_only:
+            return molecule, grid_metadata, orbitals_metadata
 
         last_block_size = (metadata['N_P']
                            - metadata['Block_Size'] * (metadata['N_Blocks'] - 1))
+        stats.n_blocks = metadata['N_Blocks']
+        if preview is not None:
+            grid_shape, _ = _lattice(grid_metadata)
+            preview_factor = np.array([preview] * 3)
+            preview_metadata = _downsampled_metadata(
+                grid_metadata, preview_factor, 'decimate')
+            preview_shape, _ = _lattice(preview_metadata)
+            preview_values = {}
+            for sym_char in orbital_values.keys():
+                preview_values[sym_char] = {}
+                for iorb, values in orbital_values[sym_char].items():
+                    preview_values[sym_char][iorb] = np.full(
+                        preview_metadata['N_of_Points'], np.nan,
+                        dtype=values.dtype)
+            stats.preview = cls(molecule, preview_metadata, preview_values,
+                                orbitals_metadata=orbitals_metadata)
+        # The grid is built before the blocks are read, so the arrays
+        # can be inspected while they are filled.
+        with stats.measure('template'):
+            grid = cls(molecule, grid_metadata, orbital_values,
+                       orbitals_metadata=orbitals_metadata)
+        grid.parse_stats = stats
+        stats.grid = grid
+        if progress is not None:
+            progress(stats)
+        n_values = grid_metadata['N_of_Points'] * sum(
+            key is not None for key in order_of_orbitals)
+        if _tokenize.choose_tokenizer(tokenizer, f, n_values) == 'numba':
+            reader = _tokenize.BlockReader(f)
+            readline = reader.readline
+        else:
+            reader = None
+            readline = f.readline
+        filled = 0
         for ib in range(metadata['N_Blocks']):
+            start_of_block = timer()
+            reading = 0.
             offset = ib * metadata['Block_Size']
+            if ib == (metadata['N_Blocks'] - 1):
+                ix = last_block_size
+            else:
+                ix = metadata['Block_Size']
+            if region is None:
+                selection = None
+                n_selected = ix
+            else:
+                index = np.unravel_index(np.arange(offset, offset + ix), shape)
+                is_inside = np.ones(ix, dtype=bool)
+                for i, (start, stop) in zip(index, ranges):
+                    is_inside &= (start <= i) & (i < stop)
+                selection = np.flatnonzero(is_inside)
+                n_selected = len(selection)
+            if preview is not None:
+                index = np.unravel_index(
+                    np.arange(filled, filled + n_selected), grid_shape)
+                is_kept = np.ones(n_selected, dtype=bool)
+                for i in index:
+                    is_kept &= (i % preview == 0)
+                preview_index = np.ravel_multi_index(
+                    [i[is_kept] // preview for i in index], preview_shape)
             for ig in range(metadata['N_of_Grids']):
+                start = timer()
+                stats.bytes_read += len(readline()) # omit Title = ...
+                if order_of_orbitals[ig] is None or n_selected == 0:
+                    if reader is None:
+                        for _ in range(ix):
+                            stats.bytes_read += len(f.readline())
+                    else:
+                        stats.bytes_read += reader.skip_lines(ix)
+                    reading += timer() - start
+                    continue
                 symmetry_charakter, number_of_order = order_of_orbitals[ig]
-                current_array = orbitals[symmetry_charakter][number_of_order]
-                f.readline() # omit Title = ...
-                if ib == (metadata['N_Blocks'] - 1):
-                    ix = last_block_size
+                current_array = orbital_values[symmetry_charakter][number_of_order]
+                if reader is not None:
+                    # Reading and conversion are one pass over the bytes.
+                    reading += timer() - start
+                    stats.bytes_read += reader.read_values(
+                        ix, current_array[filled : filled + n_selected],
+                        selection)
                 else:
-                    ix = metadata['Block_Size']
-                for ip in range(ix):
-                    current_array[offset + ip] = f.readline()
+                    # Convert every block as soon as it is read, so the
+                    # only scratch space are the Block_Size lines of one
+                    # block.
+                    lines = [f.readline() for _ in range(ix)]
+                    stats.bytes_read += sum(map(len, lines))
+                    if selection is not None:
+                        lines = [lines[i] for i in selection]
+                    reading += timer() - start
+                    current_array[filled : filled + n_selected] = lines
+                stats.points_converted += n_selected
+                if preview is not None:
+                    preview_values[symmetry_charakter][number_of_order][
+                        preview_index] = current_array[
+                            filled : filled + n_selected][is_kept]
+            filled += n_selected
+            stats.points_filled = filled
+            stats.timings['reading'] += reading
+            stats.timings['conversion'] += timer() - start_of_block - reading
+            stats.blocks_done += 1
+            if progress is not None:
+                progress(stats)
 
-        for sym_char in orbitals.keys():
-            for iorb in orbitals[sym_char].keys():
-                orbitals[sym_char][iorb] = orbitals[sym_char][iorb].astype('f8')
+        stats.grid = None
+        # Orbitals are not cached while the arrays are filled, but
+        # invalidate anyway in case a callback raced with the last block.
+        grid.orbital_cache.invalidate()
+        if preview is not None:
+            grid._downsampled[((preview,) * 3, 'decimate')] = stats.preview
+        return grid
         # return orbitals, metadata
         # return metadata
-        return cls(molecule, metadata, orbitals)
         # return orbitals
 
         # for symmetry_charakter in orbitals.keys():
@@ -0,0 +1,232 @@
+from __future__ import with_statement
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import numpy as np
+from . import export
+from ._pandas_wrapper import Core
+
+
+@export
+class Orbital(Core):
+    """An orbital, or the density, on the points of a grid.
+
+    The location of the points and the values are kept in numpy arrays.
+    The :class:`pandas.DataFrame` with the columns ``x, y, z, value``
+    is only built if :attr:`frame` is accessed.
+    Sorting, slicing with a mask, a slice or an integer array,
+    and arithmetic work directly on the arrays.
+
+    Args:
+        frame (pandas.DataFrame): Frame with the columns
+            ``x, y, z, value``. Alternatively pass ``location`` and
+            ``values``.
+        energy (float): Orbital energy.
+        occupation (float): Occupation number.
+        status (str): Status of the orbital as written by MOLCAS.
+        grid_metadata (dict): Metadata of the grid.
+        location (numpy.ndarray): Cartesian coordinates of the points
+            in Angstrom with shape ``(N, 3)``.
+        values (numpy.ndarray): Values at the points with shape ``(N,)``.
+    """
+    __slots__ = ('_location', '_values', '_frame', '_frame_is_shared',
+                 'energy', 'occupation', 'status', 'grid_metadata')
+
+    _COLUMNS = ['x', 'y', 'z', 'value']
+
+    def __init__(self, frame=None, energy=np.nan, occupation=np.nan,
+                 status='not defined', grid_metadata=None,
+                 location=None, values=None):
+        if frame is not None:
+            location = frame.loc[:, ['x', 'y', 'z']].values
+            values = frame.loc[:, 'value'].values
+        self._location = location
+        self._values = values
+        self._frame = frame
+        self._frame_is_shared = False
+        self.energy = energy
+        self.occupation = occupation
+        self.status = status
+        self.grid_metadata = grid_metadata
+
+    def _new(self, location, values):
+        return self.__class__(
+            energy=self.energy, occupation=self.occupation,
+            status=self.status, grid_metadata=self.grid_metadata,
+            location=location, values=values)
+
+    @property
+    def frame(self):
+        """The orbital as :class:`pandas.DataFrame`.
+
+        It is built on first access.
+        """
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.DataFrame(
+                {'x': self._location[:, 0], 'y': self._location[:, 1],
+                 'z': self._location[:, 2], 'value': self._values},
+                columns=self._COLUMNS)
+        return self._frame
+
+    def _read_only_frame(self):
+        """Return a new frame of the orbital whose values can not be set."""
+        import pandas as pd
+        data = np.empty((len(self._values), len(self._COLUMNS)))
+        data[:, :3] = self._location
+        data[:, 3] = self._values
+        data.flags.writeable = False
+        return pd.DataFrame(data, columns=self._COLUMNS, copy=False)
+
+    def _share_frame(self, frame):
+        """Use ``frame`` from :meth:`_read_only_frame` of an equal orbital.
+
+        The orbital gets a shallow copy, so changes of the index or the
+        order stay local, and the data is copied before it is modified.
+        """
+        self._frame = frame.copy(deep=False)
+        self._frame_is_shared = True
+
+    @property
+    def location(self):
+        """Cartesian coordinates of the points in Angstrom."""
+        return self._location
+
+    @property
+    def values(self):
+        """Values of the orbital at the points."""
+        return self._values
+
+    @property
+    def n_atoms(self):
+        # Core uses n_atoms for the length, here it is the number of points.
+        return len(self._values)
+
+    def copy(self):
+        return self._new(self._location.copy(), self._values.copy())
+
+    def __getitem__(self, key):
+        """Select columns or points.
+
+        A column name returns the values of the column as array, a list
+        of column names a sub-frame, or an orbital if it contains all
+        columns. A tuple indexes like ``frame.loc``. Masks, slices and
+        integer arrays select points and return an orbital.
+        """
+        if isinstance(key, str):
+            if key not in self._COLUMNS:
+                raise KeyError(key)
+            if key == 'value':
+                return self._values
+            return self._location[:, self._COLUMNS.index(key)]
+        if isinstance(key, list) and key and all(
+                isinstance(column, str) for column in key):
+            key = (slice(None), key)
+        if isinstance(key, tuple):
+            return super(Orbital, self).__getitem__(key)
+        return self._new(self._location[key], self._values[key])
+
+    def __setitem__(self, key, value):
+        if self._frame_is_shared:
+            # Copy on write, the data is shared with other orbitals.
+            self._frame = self._frame.copy()
+            self._frame_is_shared = False
+        super(Orbital, self).__setitem__(key, value)
+        self._location = self._frame.loc[:, ['x', 'y', 'z']].values
+        self._values = self._frame.loc[:, 'value'].values
+
+    def sort_values(self, by, axis=0, ascending=True, inplace=False,
+                    kind='quicksort', na_position='last'):
+        """Sort by the values of one or more columns.
+
+        Only sorting along the points is supported, which is done
+        with :func:`numpy.argsort` on the arrays.
+
+        Args:
+            by (str or list): Column name or list of column names.
+            ascending (bool): Sort ascending vs. descending.
+                Ties keep their order in both directions.
+            inplace (bool): If True, perform operation in-place.
+            kind (str): Sorting algorithm for a single column.
+                For several columns a stable lexicographic sort is used.
+            na_position (str): ``'first'`` puts NaNs at the beginning,
+                ``'last'`` puts NaNs at the end, per column.
+
+        Returns:
+            Orbital: Sorted orbital, or None if ``inplace``.
+        """
+        if axis not in (0, 'index'):
+            raise NotImplementedError('Orbitals can only be sorted by rows.')
+        by = [by] if isinstance(by, str) else list(by)
+        keys = [self._values if column == 'value'
+                else self._location[:, self._COLUMNS.index(column)]
+                for column in by]
+        if not ascending:
+            # Negated keys instead of a reversed order keep the ties.
+            keys = [-key for key in keys]
+        nan_first = (na_position == 'first')
+        if len(keys) == 1:
+            order = np.argsort(keys[0], kind=kind)
+            is_nan = np.isnan(keys[0][order])
+            if is_nan.any():
+                # argsort puts NaNs last, also for negated keys.
+                order = np.concatenate(
+                    [order[is_nan], order[~is_nan]] if nan_first
+                    else [order[~is_nan], order[is_nan]])
+        else:
+            # The last key of lexsort is the primary one. Every column
+            # is preceded by whether its value is NaN.
+            lexsort_keys = []
+            for key in keys[::-1]:
+                lexsort_keys += [key, np.isnan(key) != nan_first]
+            order = np.lexsort(lexsort_keys)
+        if inplace:
+            self._location = self._location[order]
+            self._values = self._values[order]
+            self._frame = None
+            self._frame_is_shared = False
+        else:
+            return self._new(self._location[order], self._values[order])
+
+    def _binary_operation(self, other, operation):
+        if isinstance(other, Orbital):
+            other = other._values
+        return self._new(self._location, operation(self._values, other))
+
+    def __add__(self, other):
+        return self._binary_operation(other, np.add)
+
+    def __radd__(self, other):
+        return self._binary_operation(other, lambda a, b: np.add(b, a))
+
+    def __sub__(self, other):
+        return self._binary_operation(other, np.subtract)
+
+    def __rsub__(self, other):
+        return self._binary_operation(other, lambda a, b: np.subtract(b, a))
+
+    def __mul__(self, other):
+        return self._binary_operation(other, np.multiply)
+
+    def __rmul__(self, other):
+        return self._binary_operation(other, lambda a, b: np.multiply(b, a))
+
+    def __truediv__(self, other):
+        return self._binary_operation(other, np.true_divide)
+
+    def __rtruediv__(self, other):
+        return self._binary_operation(
+            other, lambda a, b: np.true_divide(b, a))
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __pow__(self, other):
+        return self._binary_operation(other, np.power)
+
+    def __neg__(self):
+        return self._new(self._location, -self._values)
+
+    def __abs__(self):
+        return self._new(self._location, np.abs(self._values))
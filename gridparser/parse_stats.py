@@ -0,0 +1,105 @@
+from __future__ import with_statement
+from __future__ import division
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+import contextlib
+import timeit
+from . import export
+
+
+@export
+class ParseStats(object):
+    """Timings and counters of :meth:`Grid.parse_grid`.
+
+    An instance is passed to the ``progress`` callback of
+    :meth:`Grid.parse_grid` after every block and is available as
+    ``grid.parse_stats`` afterwards.
+
+    Attributes:
+        timings (dict): Seconds spent in each of the :attr:`PHASES`:
+
+            **header**: Metadata lines.
+
+            **molecule**: Atom lines and the chemcoord instance.
+
+            **titles**: Orbital title lines and allocation of the arrays.
+
+            **reading**: Reading the lines of the blocks.
+
+            **conversion**: Conversion of the lines to floats.
+
+            **template**: Construction of the :class:`Grid`.
+
+        bytes_read (int): Number of bytes read from the (decompressed)
+            file.
+        points_converted (int): Number of converted values.
+        n_blocks (int): Number of blocks in the file.
+        blocks_done (int): Number of blocks read so far.
+        points_filled (int): Number of points of the grid whose
+            values are read so far. They are the first points in
+            C-order.
+        grid (Grid): The grid that is filled while parsing.
+            Only values before ``points_filled`` are valid.
+            It is reset to ``None`` when parsing has finished.
+        preview (Grid): Coarse grid that is filled while parsing,
+            if ``preview`` was passed to :meth:`Grid.parse_grid`.
+    """
+    PHASES = ('header', 'molecule', 'titles', 'reading', 'conversion',
+              'template')
+
+    def __init__(self):
+        self.timings = dict((phase, 0.) for phase in self.PHASES)
+        self.bytes_read = 0
+        self.points_converted = 0
+        self.n_blocks = 0
+        self.blocks_done = 0
+        self.points_filled = 0
+        self.grid = None
+        self.preview = None
+
+    @contextlib.contextmanager
+    def measure(self, phase):
+        """Add the time spent in the ``with`` block to ``phase``."""
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self.timings[phase] += timeit.default_timer() - start
+
+    @property
+    def elapsed(self):
+        """Total time in seconds measured so far."""
+        return sum(self.timings.values())
+
+    @property
+    def points_per_second(self):
+        """Converted values per second."""
+        return self.points_converted / self.elapsed if self.elapsed else 0.
+
+    @property
+    def bytes_per_second(self):
+        """Bytes read per second."""
+        return self.bytes_read / self.elapsed if self.elapsed else 0.
+
+    def as_dict(self):
+        """Return the statistics as flat dictionary, e.g. for logging."""
+        stats = dict(('time_' + phase, self.timings[phase])
+                     for phase in self.PHASES)
+        stats.update(
+            elapsed=self.elapsed, bytes_read=self.bytes_read,
+            points_converted=self.points_converted,
+            points_per_second=self.points_per_second,
+            bytes_per_second=self.bytes_per_second,
+            n_blocks=self.n_blocks, blocks_done=self.blocks_done,
+            points_filled=self.points_filled)
+        return stats
+
+    def __repr__(self):
+        lines = ['{0:<11} {1:10.4f} s'.format(phase, self.timings[phase])
+                 for phase in self.PHASES]
+        lines.append('{0:<11} {1:10.4f} s'.format('total', self.elapsed))
+        lines.append('{0} of {1} blocks, {2} bytes, {3:.4g} points/s'.format(
+            self.blocks_done, self.n_blocks, self.bytes_read,
+            self.points_per_second))
+        return '\n'.join(lines)
@@ -54,7 +54,9 @@ def setup_package():
         long_description=readme(),
         classifiers=CLASSIFIERS,
         packages=find_packages(),
-        requires=REQUIRES
+        requires=REQUIRES,
+        entry_points={
+            'console_scripts': ['gridparser = gridparser.cli:main']}
     )
 
 
@@ -0,0 +1,47 @@
+"""Synthetic grid files shared by the tests."""
+from __future__ import division
+
+import pytest
+
+from gridparser import Grid
+from benchmarks.synthetic import write_synthetic_grid
+
+#: Arguments of :func:`write_synthetic_grid` for :func:`grid_file`.
+#: A test module overrides them with a ``GRID_ARGUMENTS`` dictionary
+#: and a test with ``pytest.mark.parametrize('grid_file', [...],
+#: indirect=True)``.
+GRID_ARGUMENTS = dict(Net=(9, 9, 9), N_of_Grids=3, Block_Size=300)
+
+
+@pytest.fixture(scope='session')
+def grid_files(tmpdir_factory):
+    """Return a function that returns a synthetic grid file.
+
+    The function takes the arguments of :func:`write_synthetic_grid`
+    except ``path``. Every file is written once per session and must
+    not be modified.
+    """
+    paths = {}
+
+    def grid_file(**kwargs):
+        arguments = dict(GRID_ARGUMENTS, **kwargs)
+        key = tuple(sorted(arguments.items()))
+        if key not in paths:
+            path = tmpdir_factory.mktemp('grid').join('in.grid')
+            paths[key] = write_synthetic_grid(str(path), **arguments)
+        return paths[key]
+    return grid_file
+
+
+@pytest.fixture
+def grid_file(request, grid_files):
+    """Path of a synthetic grid file, see :data:`GRID_ARGUMENTS`."""
+    arguments = dict(getattr(request.module, 'GRID_ARGUMENTS', {}))
+    arguments.update(getattr(request, 'param', {}))
+    return grid_files(**arguments)
+
+
+@pytest.fixture
+def grid(grid_file):
+    """The parsed :func:`grid_file`."""
+    return Grid.parse_grid(grid_file)
@@ -0,0 +1,120 @@
+"""The LRU cache of :meth:`Grid.give_orbital`."""
+from __future__ import division
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+from gridparser._cache import LRUCache
+
+
+def _frame_bytes(grid):
+    return 8 * 4 * grid.metadata['N_of_Points']
+
+
+def _assert_like_grid(orbital, grid):
+    values = grid._orbitals[1][0]
+    assert np.array_equal(orbital.values, values)
+    assert np.array_equal(orbital.frame['value'].values, values)
+    assert np.array_equal(orbital.frame.index, np.arange(len(values)))
+
+
+def test_counters():
+    cache = LRUCache(100)
+    cache.put('a', 1, 40)
+    cache.put('b', 2, 40)
+    assert cache.get('a') == 1
+    assert cache.get('c') is None
+    # b is the least recently used entry.
+    cache.put('c', 3, 40)
+    assert cache.get('b') is None
+    assert cache.stats() == {'entries': 2, 'n_bytes': 80, 'max_bytes': 100,
+                             'hits': 1, 'misses': 2, 'evictions': 1}
+
+
+def test_budget():
+    cache = LRUCache(100)
+    cache.put('large', 1, 101)
+    assert len(cache) == 0 and cache.get('large') is None
+    cache.put('a', 1, 40)
+    cache.put('b', 2, 40)
+    cache.put('a', 3, 50)
+    assert (len(cache), cache.n_bytes) == (2, 90)
+    cache.max_bytes = 60
+    assert (len(cache), cache.n_bytes, cache.evictions) == (1, 50, 1)
+    assert cache.get('a') == 3
+    cache.invalidate('a')
+    assert (len(cache), cache.n_bytes) == (0, 0)
+
+
+def test_give_orbital_hits_and_misses(grid):
+    first = grid.give_orbital(1, 0)
+    second = grid.give_orbital(1, 0)
+    assert first is not second
+    _assert_like_grid(first, grid)
+    stats = grid.orbital_cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['n_bytes'] == _frame_bytes(grid)
+
+
+def test_give_orbital_eviction(grid):
+    grid.orbital_cache.max_bytes = _frame_bytes(grid)
+    grid.give_orbital(1, 0)
+    grid.give_orbital(1, 1)
+    assert len(grid.orbital_cache) == 1
+    assert grid.orbital_cache.evictions == 1
+    grid.give_orbital(1, 0)
+    assert grid.orbital_cache.stats()['misses'] == 3
+    grid.orbital_cache.max_bytes = _frame_bytes(grid) - 1
+    assert len(grid.orbital_cache) == 0
+    grid.give_orbital(1, 0)
+    assert len(grid.orbital_cache) == 0
+
+
+def test_modified_orbitals_stay_local(grid):
+    values = grid._orbitals[1][0].copy()
+    orbital = grid.give_orbital(1, 0)
+    orbital.sort_values('value', inplace=True)
+    _assert_like_grid(grid.give_orbital(1, 0), grid)
+
+    orbital = grid.give_orbital(1, 0)
+    orbital[0, 'value'] = 5.
+    assert orbital.values[0] == orbital.frame.loc[0, 'value'] == 5.
+    _assert_like_grid(grid.give_orbital(1, 0), grid)
+
+    orbital = grid.give_orbital(1, 0)
+    orbital.index = orbital.index + 1
+    _assert_like_grid(grid.give_orbital(1, 0), grid)
+
+    orbital = grid.give_orbital(1, 0)
+    with pytest.raises(ValueError):
+        orbital.values[0] = 5.
+    assert np.array_equal(grid._orbitals[1][0], values)
+
+
+@pytest.mark.parametrize('operation', ['add', 'subtract'])
+def test_invalidated_by_inplace_arithmetic(grid, grid_file, operation):
+    other = Grid.parse_grid(grid_file)
+    before = grid.give_orbital(1, 1).frame['value'].values.copy()
+    if operation == 'add':
+        grid += other
+        expected = 2 * before
+    else:
+        grid -= other
+        expected = np.zeros_like(before)
+    assert np.array_equal(grid.give_orbital(1, 1).frame['value'].values,
+                          expected)
+    assert grid.orbital_cache.stats()['misses'] == 2
+
+
+def test_nothing_cached_while_parsing(grid_file):
+    sizes = []
+
+    def progress(stats):
+        if stats.blocks_done:
+            stats.grid.give_orbital(1, 0).frame
+            sizes.append(len(stats.grid.orbital_cache))
+
+    grid = Grid.parse_grid(grid_file, progress=progress)
+    assert sizes and not any(sizes)
+    _assert_like_grid(grid.give_orbital(1, 0), grid)
@@ -0,0 +1,125 @@
+"""The ``gridparser`` command line interface."""
+from __future__ import division
+import lzma
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+from gridparser.cli import main
+from gridparser.gridparser import _lattice
+
+GRID_ARGUMENTS = dict(Net=(4, 5, 6), Block_Size=70)
+
+
+@pytest.fixture
+def cli_file(grid_file, tmpdir):
+    """A copy of grid_file, so the outputs are written into tmpdir."""
+    return shutil.copy(grid_file, str(tmpdir.join('a.grid')))
+
+
+def _read_cube(path):
+    with open(path) as f:
+        lines = f.readlines()
+    n_atoms = int(lines[2].split()[0])
+    origin = np.array(lines[2].split()[1:], dtype='f8')
+    axes = np.array([line.split() for line in lines[3:6]], dtype='f8')
+    values = np.array(' '.join(lines[6 + n_atoms:]).split(), dtype='f8')
+    return n_atoms, origin, axes, values
+
+
+def test_info(cli_file, capsys):
+    assert main(['info', cli_file]) == 0
+    output = capsys.readouterr().out
+    assert output.startswith(cli_file)
+    assert '3 atoms, 210 points (5 x 6 x 7), 3 blocks of 70' in output
+    assert 'density' in output and '2:1' in output
+
+
+def test_convert_npy(cli_file, tmpdir, capsys):
+    output_dir = str(tmpdir.join('out'))
+    assert main(['convert', '-o', output_dir, cli_file]) == 0
+    grid = Grid.parse_grid(cli_file)
+    shape, _ = _lattice(grid.metadata)
+    output = capsys.readouterr().out
+    for name, key in [('density', (1, 0)), ('1_1', (1, 1)), ('2_1', (2, 1))]:
+        path = os.path.join(output_dir, 'a_{0}.npy'.format(name))
+        assert path in output
+        assert np.array_equal(np.load(path),
+                              grid._orbitals[key[0]][key[1]].reshape(shape))
+
+
+def test_convert_compact(cli_file, tmpdir):
+    assert main(['convert', '-f', 'compact', '--orbitals', '2:1',
+                 '--no-density', '--dtype', 'f4', cli_file]) == 0
+    grid = Grid.parse_grid(cli_file)
+    shape, basis = _lattice(grid.metadata)
+    with np.load(str(tmpdir.join('a.npz'))) as arrays:
+        assert sorted(arrays.files) == ['2_1', 'basis', 'origin']
+        assert arrays['2_1'].dtype == np.float32
+        assert np.array_equal(
+            arrays['2_1'], grid._orbitals[2][1].astype('f4').reshape(shape))
+        assert np.allclose(arrays['basis'], basis)
+
+
+def test_convert_cube(cli_file, tmpdir):
+    assert main(['convert', '-f', 'cube', '--orbitals', '1:1',
+                 '--no-density', cli_file]) == 0
+    grid = Grid.parse_grid(cli_file)
+    shape, basis = _lattice(grid.metadata)
+    n_atoms, origin, axes, values = _read_cube(str(tmpdir.join('a_1_1.cube')))
+    assert n_atoms == len(grid.structure)
+    assert np.allclose(origin, grid.metadata['Origin'])
+    assert np.array_equal(axes[:, 0], shape)
+    assert np.allclose(axes[:, 1:], basis)
+    assert np.allclose(values, grid._orbitals[1][1], rtol=1e-5)
+
+
+def test_write_cube_lines(cli_file, tmpdir):
+    grid = Grid.parse_grid(cli_file)
+    path = str(tmpdir.join('density.cube'))
+    # Chunks that do not hold whole rows of the last axis.
+    grid.write_cube(path, chunk_size=5)
+    with open(path) as f:
+        lines = f.readlines()[6 + len(grid.structure):]
+    # Rows of 7 values along the last axis are split into 6 + 1.
+    assert [len(line.split()) for line in lines[:4]] == [6, 1, 6, 1]
+    _, _, _, values = _read_cube(path)
+    assert np.allclose(values, grid._orbitals[1][0], rtol=1e-5)
+
+
+def test_jobs(cli_file, grid_files, tmpdir, capsys):
+    other = shutil.copy(
+        grid_files(Net=(3, 3, 3), N_of_Grids=2, Block_Size=30),
+        str(tmpdir.join('b.grid')))
+    assert main(['convert', '-j', '2', '-f', 'compact', cli_file,
+                 other]) == 0
+    output = capsys.readouterr().out
+    assert cli_file in output and other in output
+    for name, path in [('a', cli_file), ('b', other)]:
+        grid = Grid.parse_grid(path)
+        with np.load(str(tmpdir.join(name + '.npz'))) as arrays:
+            assert np.array_equal(arrays['density'].ravel(),
+                                  grid._orbitals[1][0])
+
+
+def test_same_stems_are_refused(cli_file, tmpdir, capsys):
+    compressed = cli_file + '.xz'
+    with open(cli_file, 'rb') as f, lzma.open(compressed, 'wb') as out:
+        out.write(f.read())
+    with pytest.raises(SystemExit) as error:
+        main(['convert', '-j', '2', cli_file, compressed])
+    assert error.value.code == 2
+    assert 'same files' in capsys.readouterr().err
+    assert not tmpdir.join('a_density.npy').exists()
+    assert main(['convert', '-o', str(tmpdir.join('xz')), compressed]) == 0
+
+
+def test_failed_file(cli_file, tmpdir, capsys):
+    missing = str(tmpdir.join('missing.grid'))
+    assert main(['convert', '-f', 'compact', missing, cli_file]) == 1
+    captured = capsys.readouterr()
+    assert missing in captured.err
+    assert cli_file in captured.out
@@ -0,0 +1,47 @@
+"""Coarse grids of :meth:`Grid.downsample`."""
+from __future__ import division
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+from gridparser.gridparser import _lattice
+
+# Net + 1 is not divisible by most factors.
+GRID_ARGUMENTS = dict(Net=(9, 11, 13), Block_Size=200)
+
+
+@pytest.mark.parametrize('factor', [2, 3, 4, (4, 3, 5)])
+def test_mean_points_are_centers_of_blocks(grid, factor):
+    coarse = grid.downsample(factor, method='mean')
+    shape, _ = _lattice(grid.metadata)
+    coarse_shape, _ = _lattice(coarse.metadata)
+    factor = np.broadcast_to(factor, (3,))
+    assert tuple(coarse_shape) == tuple(np.array(shape) // factor)
+
+    location = grid._orbital_template.reshape(tuple(shape) + (3,))
+    values = grid._orbitals[1][0].reshape(shape)
+    coarse_location = coarse._orbital_template.reshape(
+        tuple(coarse_shape) + (3,))
+    coarse_values = coarse._orbitals[1][0].reshape(coarse_shape)
+    for index in np.ndindex(*coarse_shape):
+        block = tuple(slice(i * f, (i + 1) * f) for i, f in zip(index, factor))
+        assert np.allclose(coarse_location[index],
+                           location[block].reshape(-1, 3).mean(axis=0))
+        assert np.isclose(coarse_values[index], values[block].mean())
+
+
+def test_decimate_keeps_points(grid):
+    coarse = grid.downsample(4, method='decimate')
+    shape, _ = _lattice(grid.metadata)
+    location = grid._orbital_template.reshape(tuple(shape) + (3,))
+    assert np.allclose(coarse._orbital_template,
+                       location[::4, ::4, ::4].reshape(-1, 3))
+    assert np.array_equal(
+        coarse._orbitals[1][0],
+        grid._orbitals[1][0].reshape(shape)[::4, ::4, ::4].ravel())
+
+
+def test_factor_larger_than_grid(grid):
+    with pytest.raises(ValueError):
+        grid.downsample(20, method='mean')
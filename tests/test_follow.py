@@ -0,0 +1,97 @@
+"""Following a grid file while it is written, see :class:`GridFollower`."""
+from __future__ import division
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+from gridparser.follow import GridFollower
+
+POLL_INTERVAL = 0.005
+
+
+def _write_slowly(data, path, piece_size=7 * 1024, pause=0.002):
+    with open(path, 'wb') as f:
+        for start in range(0, len(data), piece_size):
+            f.write(data[start:start + piece_size])
+            f.flush()
+            time.sleep(pause)
+
+
+def test_follow_growing_file(grid_file, tmpdir):
+    path = str(tmpdir.join('growing.grid'))
+    with open(grid_file, 'rb') as f:
+        data = f.read()
+    blocks = []
+    follower = GridFollower(
+        path, poll_interval=POLL_INTERVAL, timeout=30,
+        callback=lambda follower: blocks.append(follower.blocks_done))
+    writer = threading.Thread(target=_write_slowly, args=(data, path))
+    writer.start()
+    grid = follower.wait_for_grid(timeout=30)
+    assert grid is not None
+    assert follower.wait(timeout=30)
+    writer.join()
+    follower.stop()
+
+    expected = Grid.parse_grid(grid_file)
+    n_blocks = expected.metadata['N_Blocks']
+    assert blocks == list(range(1, n_blocks + 1))
+    assert follower.points_filled == expected.metadata['N_of_Points']
+    for sym_char in expected._orbitals:
+        for iorb in expected._orbitals[sym_char]:
+            assert np.array_equal(grid._orbitals[sym_char][iorb],
+                                  expected._orbitals[sym_char][iorb])
+
+
+def test_stop_before_file_exists(tmpdir):
+    follower = GridFollower(str(tmpdir.join('missing.grid')),
+                            poll_interval=POLL_INTERVAL)
+    assert follower.wait_for_grid(timeout=0.05) is None
+    follower.stop()
+    assert follower.finished
+    assert follower.error is None
+    assert follower.grid is None
+    assert not follower.wait(timeout=1)
+
+
+def test_timeout(grid_file, tmpdir):
+    path = str(tmpdir.join('stalled.grid'))
+    with open(grid_file, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        # The writer stalls in the middle of the first block.
+        f.write(data[:len(data) // 4])
+    follower = GridFollower(path, poll_interval=POLL_INTERVAL, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        follower.wait(timeout=30)
+    assert follower.finished
+    assert follower.blocks_done < follower.grid.metadata['N_Blocks']
+
+
+def test_error_in_parsing_thread(grid_file, tmpdir):
+    path = str(tmpdir.join('corrupt.grid'))
+    with open(grid_file, 'rb') as f:
+        lines = f.readlines()
+    # Corrupt a value of the last block.
+    lines[-2] = b'not a number\n'
+    with open(path, 'wb') as f:
+        f.writelines(lines)
+    follower = GridFollower(path, poll_interval=POLL_INTERVAL, timeout=5)
+    with pytest.raises(ValueError):
+        follower.wait(timeout=30)
+    assert follower.blocks_done > 0
+    # Blocks that are done can still be waited for.
+    assert follower.wait(1, timeout=1)
+
+
+def test_error_in_callback(grid_file):
+    def callback(follower):
+        raise RuntimeError('callback failed')
+
+    follower = GridFollower(grid_file, poll_interval=POLL_INTERVAL, timeout=5,
+                            callback=callback)
+    with pytest.raises(RuntimeError, match='callback failed'):
+        follower.wait(timeout=30)
@@ -0,0 +1,42 @@
+"""Vectorized formatting of values as in :meth:`Grid.write_grid`."""
+from __future__ import division
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+from gridparser._formatting import format_values
+
+
+def _random_values(n=200000, seed=0):
+    rng = np.random.RandomState(seed)
+    values = rng.standard_normal(n) * 10. ** rng.randint(-110, 110, n)
+    special = [0., -0., np.nan, np.inf, -np.inf, 1.5, 0.5, 2.5e-5, 1e-310,
+               9.999999999999999e99, 1e100, 0.1, 1 / 3., 5e-324]
+    return np.concatenate([special, values])
+
+
+@pytest.mark.parametrize('precision', [10, 16])
+def test_like_python(precision):
+    values = _random_values()
+    template = '{{0:{0}.{1}E}}\n'.format(precision + 8, precision)
+    expected = ''.join(template.format(x) for x in values.tolist())
+    assert format_values(values, precision) == expected.encode()
+
+
+def test_lossless_with_precision_16(grid, tmpdir):
+    values = _random_values()
+    assert np.array_equal(
+        np.array(format_values(values, 16).split(), dtype='f8'), values,
+        equal_nan=True)
+
+    grid._orbitals[1][0][:] = values[-len(grid._orbitals[1][0]):]
+    grid.write_grid(str(tmpdir.join('out.grid')), precision=16)
+    written = Grid.parse_grid(str(tmpdir.join('out.grid')))
+    assert np.array_equal(written._orbitals[1][0], grid._orbitals[1][0])
+
+
+@pytest.mark.parametrize('precision', [0, 18])
+def test_invalid_precision(precision):
+    with pytest.raises(ValueError):
+        format_values(np.ones(3), precision)
@@ -0,0 +1,63 @@
+"""Peak memory of :meth:`Grid.parse_grid` on a synthetic grid."""
+from __future__ import division
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NET = (79, 79, 79)
+N_OF_GRIDS = 3
+BLOCK_SIZE = 100000
+GRID_ARGUMENTS = dict(Net=NET, N_of_Grids=N_OF_GRIDS, Block_Size=BLOCK_SIZE)
+
+#: Memory allowed on top of the final arrays, the template and one block.
+SLACK = 20 * 1024 ** 2
+
+_SCRIPT = textwrap.dedent('''
+    import json, resource, sys
+    import gridparser
+    from gridparser import Grid
+    import chemcoord, pandas, scipy.constants
+
+    def peak():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    before = peak()
+    Grid.parse_grid(sys.argv[1], tokenizer=sys.argv[2])
+    print(json.dumps({'before': before, 'after': peak()}))
+''')
+
+
+def _numba_available():
+    from gridparser._tokenize import numba_available
+    return numba_available()
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'),
+                    reason='ru_maxrss is in kB only on Linux')
+@pytest.mark.parametrize('tokenizer', [
+    'numpy',
+    pytest.param('numba', marks=pytest.mark.skipif(
+        not _numba_available(), reason='numba is not installed'))])
+def test_peak_memory_of_parse_grid(grid_file, tokenizer):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [p for p in [env.get('PYTHONPATH')] if p])
+    output = subprocess.check_output(
+        [sys.executable, '-c', _SCRIPT, grid_file, tokenizer], env=env)
+    peak = json.loads(output.decode().strip().splitlines()[-1])
+
+    n_points = 1
+    for n in NET:
+        n_points *= n + 1
+    arrays = 8 * n_points * N_OF_GRIDS
+    template = 8 * 3 * n_points
+    # Python str or bytes of every line of one block.
+    block = 100 * BLOCK_SIZE
+    bound = arrays + template + block + SLACK
+    assert peak['after'] - peak['before'] < bound
@@ -0,0 +1,69 @@
+"""Orbital behaves like the equivalent DataFrame."""
+from __future__ import division
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridparser.orbital import Orbital
+
+
+@pytest.fixture
+def orbital():
+    rng = np.random.RandomState(0)
+    # Few distinct values, so that there are many ties.
+    location = rng.randint(0, 3, (200, 3)).astype('f8')
+    values = rng.randint(0, 3, 200).astype('f8')
+    values[::17] = np.nan
+    return Orbital(location=location, values=values)
+
+
+def _frame(orbital):
+    return pd.DataFrame(np.column_stack([orbital._location, orbital._values]),
+                        columns=Orbital._COLUMNS)
+
+
+def test_no_instance_dict(orbital):
+    assert not hasattr(orbital, '__dict__')
+
+
+@pytest.mark.parametrize('by', ['value', ['x', 'value'], ['value', 'y', 'z']])
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('na_position', ['first', 'last'])
+def test_sort_values_like_pandas(orbital, by, ascending, na_position):
+    expected = _frame(orbital).sort_values(by, ascending=ascending, kind='stable',
+                                 na_position=na_position)
+    result = orbital.sort_values(by, ascending=ascending, kind='stable',
+                                 na_position=na_position)
+    assert np.array_equal(result._location, expected[['x', 'y', 'z']].values)
+    assert np.array_equal(result._values, expected['value'].values,
+                          equal_nan=True)
+
+
+@pytest.mark.parametrize('column', Orbital._COLUMNS)
+def test_getitem_column(orbital, column):
+    assert np.array_equal(orbital[column], _frame(orbital)[column].values,
+                          equal_nan=True)
+
+
+def test_getitem_columns(orbital):
+    frame = _frame(orbital)
+    pd.testing.assert_frame_equal(orbital[['x', 'value']],
+                                  frame[['x', 'value']])
+    selected = orbital[['x', 'y', 'z', 'value']]
+    assert isinstance(selected, Orbital)
+    assert np.array_equal(selected.values, orbital.values, equal_nan=True)
+    with pytest.raises(KeyError):
+        orbital['w']
+
+
+@pytest.mark.parametrize('key', [
+    slice(10, 20), [3, 1, 2], np.arange(5), 'mask'])
+def test_getitem_points(orbital, key):
+    if isinstance(key, str):
+        key = orbital['x'] > 1
+    selected = orbital[key]
+    assert isinstance(selected, Orbital)
+    assert np.array_equal(selected.location, orbital.location[key])
+    assert np.array_equal(selected.values, orbital.values[key],
+                          equal_nan=True)
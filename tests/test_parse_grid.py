@@ -0,0 +1,45 @@
+"""Selection of orbitals and previews in :meth:`Grid.parse_grid`."""
+from __future__ import division
+import pickle
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+
+
+def _keys(grid):
+    return sorted((symmetry_char, iorb)
+                  for symmetry_char in grid._orbitals
+                  for iorb in grid._orbitals[symmetry_char])
+
+
+@pytest.mark.parametrize('include_density', [True, False])
+def test_density_selected_by_orbitals(grid_file, include_density):
+    grid = Grid.parse_grid(grid_file, orbitals=[(1, 0)],
+                           include_density=include_density)
+    assert _keys(grid) == [(1, 0)]
+
+
+def test_include_density(grid_file):
+    assert _keys(Grid.parse_grid(grid_file, orbitals=[(2, 1)])) == [
+        (1, 0), (2, 1)]
+    assert _keys(Grid.parse_grid(grid_file, orbitals=[(2, 1)],
+                                 include_density=False)) == [(2, 1)]
+
+
+def test_missing_orbital(grid_file):
+    with pytest.raises(ValueError, match='not in the grid file'):
+        Grid.parse_grid(grid_file, orbitals=[(1, 5)])
+
+
+def test_pickle_without_preview(grid_file):
+    grid = Grid.parse_grid(grid_file, preview=2)
+    assert grid.parse_stats.preview is not None
+    copied = pickle.loads(pickle.dumps(grid))
+    assert copied.parse_stats.preview is None
+    assert grid.parse_stats.preview is not None
+    assert copied.parse_stats.blocks_done == grid.parse_stats.blocks_done
+    expected = grid.downsample(2, method='decimate')
+    result = copied.downsample(2, method='decimate')
+    assert np.array_equal(result._orbitals[1][0], expected._orbitals[1][0])
@@ -0,0 +1,70 @@
+"""Grids in shared memory, see :meth:`Grid.share`."""
+from __future__ import division
+import gc
+import pickle
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from gridparser import Grid
+
+
+@pytest.fixture(params=['memory', 'file'])
+def shared_grid(request, grid_file, tmpdir):
+    path = None if request.param == 'memory' else str(tmpdir.join('shared'))
+    grid = Grid.parse_grid(grid_file).share(path)
+    yield grid
+    grid.unshare()
+
+
+def _density_in_worker(grid):
+    density = grid.give_orbital(1, 0).values
+    del grid
+    gc.collect()
+    return density.sum()
+
+
+def _write_in_worker(grid):
+    grid._orbitals[1][0][0] = 42.
+
+
+def test_views_after_unshare(shared_grid):
+    expected = shared_grid._orbitals[1][0].copy()
+    values = shared_grid._orbitals[1][0]
+    orbital = shared_grid.give_orbital(1, 0)
+    shared_grid.unshare()
+    gc.collect()
+    assert np.array_equal(values, expected)
+    assert np.array_equal(orbital.values, expected)
+
+
+def test_views_after_grid_is_dropped(shared_grid):
+    expected = shared_grid._orbitals[1][0].copy()
+    copied = pickle.loads(pickle.dumps(shared_grid))
+    values = copied.give_orbital(1, 0).values
+    del copied
+    gc.collect()
+    assert np.array_equal(values, expected)
+
+
+def test_mapping_closed_after_last_view(shared_grid):
+    copied = pickle.loads(pickle.dumps(shared_grid))
+    values = copied._orbitals[1][0]
+    mapping = weakref.ref(copied._shared.arrays[None].base)
+    del copied
+    gc.collect()
+    assert mapping() is not None
+    del values
+    gc.collect()
+    assert mapping() is None
+
+
+def test_workers(shared_grid):
+    expected = shared_grid._orbitals[1][0].sum()
+    with ProcessPoolExecutor(2) as executor:
+        sums = list(executor.map(_density_in_worker, [shared_grid] * 4))
+        assert np.allclose(sums, expected)
+        executor.submit(_write_in_worker, shared_grid).result()
+    assert shared_grid._orbitals[1][0][0] == 42.
@@ -0,0 +1,105 @@
+"""The numba tokenizer converts like :func:`float`."""
+from __future__ import division
+import io
+
+import numpy as np
+import pytest
+
+pytest.importorskip('numba')
+
+from gridparser import _tokenize
+
+EDGE_CASES = [
+    '0.0', '-0.0', '1', '-1.5', '+2.5', '.5', '5.', '1E5', '1e-5',
+    '0.0000000000E+00', '1.7976931348623157E+308', '2.2250738585072014E-308',
+    '4.9406564584124654E-324', '2.2250738585072009E-308', '1E-320', '1E400',
+    '-1E400', '1E-400', '9007199254740993', '9007199254740993.0000000001',
+    '123456789012345678901234567890', '0.1000000000000000055511151231257827',
+    '1.00000000000000011102230246251565404236316680908203125', 'nan',
+    'inf', '-inf', '8.589973e9', '1.448997445238699', '5E-324',
+    '6.6260701500000000E-34']
+
+
+def _read(data, n_lines, chunk_size=_tokenize.CHUNK_SIZE):
+    reader = _tokenize.BlockReader(io.BytesIO(data), chunk_size=chunk_size)
+    out = np.empty(n_lines)
+    n_bytes = reader.read_values(n_lines, out)
+    return out, n_bytes
+
+
+def _assert_identical(values, expected):
+    expected = np.array(expected)
+    assert np.array_equal(values.view('i8'), expected.view('i8'))
+
+
+def _random_numbers(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return (rng.standard_normal(n) * 10. ** rng.randint(-300, 300, n)).tolist()
+
+
+@pytest.mark.parametrize('form', ['{0:.16E}', '{0:18.10E}', '{0!r}'])
+def test_random_values(form):
+    lines = [form.format(x) for x in _random_numbers(20000)]
+    data = ''.join(line + '\n' for line in lines).encode()
+    values, n_bytes = _read(data, len(lines))
+    _assert_identical(values, [float(line) for line in lines])
+    assert n_bytes == len(data)
+
+
+def test_edge_cases():
+    data = ''.join(line + '\n' for line in EDGE_CASES).encode()
+    values, _ = _read(data, len(EDGE_CASES))
+    _assert_identical(values, [float(line) for line in EDGE_CASES])
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64])
+def test_lines_across_chunks(chunk_size):
+    lines = ['{0:.16E}'.format(x) for x in _random_numbers(500, seed=1)]
+    lines += EDGE_CASES
+    data = ''.join(line + '\n' for line in lines).encode()
+    values, n_bytes = _read(data, len(lines), chunk_size=chunk_size)
+    _assert_identical(values, [float(line) for line in lines])
+    assert n_bytes == len(data)
+
+
+@pytest.mark.parametrize('line', [
+    'NaN', '-nan', '+inf', 'Infinity', '-INFINITY', ' 1_000.5',
+    '\x0c1.0', '1.0\x0b', '5.e3', '1E99999999999999999999',
+    '-1e-99999999999999999999'])
+def test_uncommon_syntax(line):
+    data = '1.0\n{0}\n2.0\n'.format(line).encode()
+    values, _ = _read(data, 3)
+    _assert_identical(values, [1., float(line), 2.])
+
+
+def test_crlf():
+    lines = ['  1.0000000000E+00', '-3.3333333333333331E-01', '1E-320']
+    data = ''.join(line + '\r\n' for line in lines).encode()
+    values, n_bytes = _read(data, len(lines), chunk_size=5)
+    _assert_identical(values, [float(line) for line in lines])
+    assert n_bytes == len(data)
+
+
+@pytest.mark.parametrize('last', ['2.5', '1.7976931348623157E+308'])
+def test_missing_trailing_newline(last):
+    data = '1.0\n{0}'.format(last).encode()
+    values, _ = _read(data, 2, chunk_size=3)
+    _assert_identical(values, [1., float(last)])
+
+
+@pytest.mark.parametrize('line', [
+    'abc', 'nope', 'imaginary', 'infinit', 'nan5', '1.0E', '1.0e+', '.',
+    '+', '', '.e3', '1.5D-03', '-2.25d+02', '0x10', '1.0e+1.', ' - 1',
+    '1.0 2.0', '1..0'])
+def test_malformed_line(line):
+    data = '1.0\n{0}\n'.format(line).encode()
+    with pytest.raises(ValueError) as numpy_error:
+        np.empty(2)[:] = data.splitlines(True)
+    with pytest.raises(ValueError) as numba_error:
+        _read(data, 2)
+    assert str(numba_error.value) == str(numpy_error.value)
+
+
+def test_truncated_file():
+    with pytest.raises(ValueError):
+        _read(b'1.0\n', 2)
@@ -0,0 +1,61 @@
+"""Round trip of :meth:`Grid.write_grid` and :meth:`Grid.parse_grid`."""
+from __future__ import division
+
+import numpy as np
+
+from gridparser import Grid
+
+GRID_ARGUMENTS = dict(Net=(5, 6, 7), N_of_Grids=4, Block_Size=50)
+
+
+def _metadata_lines(path):
+    """Return the tokens of the metadata lines, numbers as floats."""
+    lines = {}
+    with open(path) as f:
+        for line in f:
+            if line.startswith('GridName'):
+                break
+            key, _, value = line.partition('=')
+            if not value:
+                continue
+            tokens = []
+            for token in value.split():
+                try:
+                    tokens.append(float(token))
+                except ValueError:
+                    tokens.append(token)
+            lines[key.strip()] = tokens
+    return lines
+
+
+def test_round_trip(grid_file, tmpdir):
+    grid = Grid.parse_grid(grid_file)
+    path = str(tmpdir.join('out.grid'))
+    grid.write_grid(path)
+    assert _metadata_lines(path) == _metadata_lines(grid_file)
+
+    written = Grid.parse_grid(path)
+    assert written.orbitals_metadata == grid.orbitals_metadata
+    for sym_char in grid._orbitals:
+        for iorb in grid._orbitals[sym_char]:
+            assert np.array_equal(written._orbitals[sym_char][iorb],
+                                  grid._orbitals[sym_char][iorb])
+
+
+def test_is_cutoff_is_kept(grid_file, tmpdir):
+    grid = Grid.parse_grid(grid_file)
+    assert grid.metadata['Is_cutoff'] is False
+    path = str(tmpdir.join('out.grid'))
+    grid.write_grid(path)
+    assert _metadata_lines(path)['Is_cutoff'] == [0.]
+
+
+def test_round_trip_of_cropped_grid(grid_file, tmpdir):
+    grid = Grid.parse_grid(grid_file)
+    cropped = grid.crop(np.array([[-0.5, -0.5, -0.5], [0.5, 0.5, 0.5]]))
+    path = str(tmpdir.join('cropped.grid.gz'))
+    cropped.write_grid(path)
+    written = Grid.parse_grid(path)
+    assert written.metadata['N_of_Points'] == cropped.metadata['N_of_Points']
+    assert np.array_equal(written._orbitals[1][0], cropped._orbitals[1][0])
+    assert np.allclose(written._orbital_template, cropped._orbital_template)